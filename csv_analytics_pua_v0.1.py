@@ -1,15 +1,50 @@
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 import os
+import time
 
 # Define TNB cost rate (example: 0.355 RM/kWh)
 COST_RATE = 0.355
 
+# Timestamp format written by the energy logger
+TIMESTAMP_FORMAT = '%d/%m/%Y %H:%M:%S'
+
+# Rows read per chunk; bounds memory use regardless of the log's length
+CHUNK_SIZE = 200_000
+
+# Error log, opened on first use and kept open (line-buffered) for the rest of the run
+_log_file = None
+
 def log_error(message):
     """Log errors to a file with a timestamp."""
-    with open("error_log.txt", "a") as log_file:
-        log_file.write(f"{pd.Timestamp.now()} - {message}\n")
+    global _log_file
+    if _log_file is None:
+        _log_file = open("error_log.txt", "a", buffering=1)
+    _log_file.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} - {message}\n")
+
+def parse_timestamps(series):
+    """Parse timestamps with the logger's fixed format, inferring it only if that fails."""
+    try:
+        return pd.to_datetime(series, format=TIMESTAMP_FORMAT, cache=True)
+    except ValueError:
+        return pd.to_datetime(series, cache=True)
+
+def _decimate(df, columns, n_out=2000):
+    # Min and max row of every column per bucket, so spikes survive at plot resolution
+    if len(df) <= n_out:
+        return df[columns]
+    Y = df[columns].to_numpy(dtype=float)
+    n = len(Y)
+    bucket = -(-n // (n_out // 2))
+    n_blocks = -(-n // bucket)
+    blocks = np.pad(Y, ((0, n_blocks * bucket - n), (0, 0)), constant_values=np.nan).reshape(n_blocks, bucket, -1)
+    offsets = (np.arange(n_blocks) * bucket)[:, None]
+    lo = np.argmin(np.where(np.isnan(blocks), np.inf, blocks), axis=1) + offsets
+    hi = np.argmax(np.where(np.isnan(blocks), -np.inf, blocks), axis=1) + offsets
+    idx = np.unique(np.concatenate([lo.ravel(), hi.ravel()]))
+    return df[columns].iloc[idx[idx < n]]
 
 def validate_columns(data, required_columns):
     """Validate that all required columns are present."""
@@ -19,6 +54,43 @@ def validate_columns(data, required_columns):
         return False
     return True
 
+def summarize_energy(file_path, columns):
+    """Stream the CSV in chunks, accumulating the report totals and decimated trend series."""
+    total_energy = total_cost = 0.0
+    peak_demand = np.nan
+    rows = missing_data_points = 0
+    cost_trends, demand_trends = [], []
+    for chunk in pd.read_csv(file_path, usecols=columns, chunksize=CHUNK_SIZE):
+        ts = parse_timestamps(chunk['timestamp']).to_numpy()
+        energy = pd.to_numeric(chunk['total_real_energy'], errors='coerce').to_numpy(dtype=float)
+        power = chunk['total_real_power'].to_numpy(dtype=float)
+
+        # Cost per hour, counting missing energy readings as 0
+        cost = np.nan_to_num(energy) * COST_RATE
+
+        total_energy += np.nansum(energy)
+        total_cost += cost.sum()
+        if not np.isnan(power).all():
+            peak_demand = np.fmax(peak_demand, np.nanmax(power))
+        rows += len(chunk)
+        missing_data_points += np.isnan(energy).sum()
+
+        trend = pd.DataFrame({'cost': cost, 'demand': power}, index=ts)
+        cost_trends.append(_decimate(trend, ['cost']))
+        demand_trends.append(_decimate(trend, ['demand']))
+
+    cost_trend = _decimate(pd.concat(cost_trends), ['cost'])['cost']
+    demand_trend = _decimate(pd.concat(demand_trends), ['demand'])['demand']
+    return {
+        'total_energy': total_energy,
+        'total_cost': total_cost,
+        'peak_demand': peak_demand,
+        'avg_cost_per_hour': total_cost / rows if rows else np.nan,
+        'missing_data_points': missing_data_points,
+        'cost_trend': (cost_trend.index, cost_trend.to_numpy()),
+        'demand_trend': (demand_trend.index, demand_trend.to_numpy()),
+    }
+
 def main():
     # Prompt user for file path
     file_path = input("Enter the path to the filtered .csv file: ").strip()
@@ -29,8 +101,8 @@ def main():
         return
     
     try:
-        # Load the data
-        data = pd.read_csv(file_path)
+        # Only the header is read up front; the rows are streamed in summarize_energy
+        data = pd.read_csv(file_path, nrows=0)
     except Exception as e:
         log_error(f"Failed to read file {file_path}: {str(e)}")
         print("Error: Unable to read the file. Check the format and try again.")
@@ -42,70 +114,55 @@ def main():
         print("Error: Missing required columns. Check the error log for details.")
         return
 
-    # Convert timestamp to datetime and energy to numeric
+    # Convert timestamp to datetime and energy to numeric while streaming the totals
     try:
-        data['timestamp'] = pd.to_datetime(data['timestamp'])
-        data['total_real_energy'] = pd.to_numeric(data['total_real_energy'], errors='coerce')
+        summary = summarize_energy(file_path, required_columns)
     except Exception as e:
         log_error(f"Data parsing error: {str(e)}")
         print("Error: Failed to parse data. Check the error log for details.")
         return
 
-    # Fill missing energy values with 0
-    data['total_real_energy'].fillna(0, inplace=True)
-
-    # Calculate cost per hour
-    data['cost_per_hour'] = data['total_real_energy'] * COST_RATE
-
     # Generate the PDF report
     pdf_filename = "Energy_Report.pdf"
+    # One figure is reused for every page; the constrained layout replaces per-page tight_layout
+    fig, ax = plt.subplots(figsize=(12, 6), layout='constrained')
     with PdfPages(pdf_filename) as pdf:
         # Page 1: Cost Per Hour Trend
-        plt.figure(figsize=(12, 6))
-        plt.plot(data['timestamp'], data['cost_per_hour'], label='Cost per Hour (RM)', color='blue')
-        plt.title("Cost Per Hour Trend")
-        plt.xlabel("Timestamp")
-        plt.ylabel("Cost (RM)")
-        plt.grid(True)
-        plt.legend()
-        plt.tight_layout()
-        pdf.savefig()
-        plt.close()
+        ax.plot(*summary['cost_trend'], label='Cost per Hour (RM)', color='blue')
+        ax.set_title("Cost Per Hour Trend")
+        ax.set_xlabel("Timestamp")
+        ax.set_ylabel("Cost (RM)")
+        ax.grid(True)
+        ax.legend()
+        pdf.savefig(fig)
 
         # Page 2: Peak Demand Trend
-        plt.figure(figsize=(12, 6))
-        plt.plot(data['timestamp'], data['total_real_power'], label='Peak Demand (kW)', color='orange')
-        plt.title("Peak Demand Trend")
-        plt.xlabel("Timestamp")
-        plt.ylabel("Demand (kW)")
-        plt.grid(True)
-        plt.legend()
-        plt.tight_layout()
-        pdf.savefig()
-        plt.close()
+        ax.cla()
+        ax.plot(*summary['demand_trend'], label='Peak Demand (kW)', color='orange')
+        ax.set_title("Peak Demand Trend")
+        ax.set_xlabel("Timestamp")
+        ax.set_ylabel("Demand (kW)")
+        ax.grid(True)
+        ax.legend()
+        pdf.savefig(fig)
 
         # Page 3: Summary Table
-        total_energy = data['total_real_energy'].sum()
-        total_cost = data['cost_per_hour'].sum()
-        peak_demand = data['total_real_power'].max()
-        avg_cost_per_hour = data['cost_per_hour'].mean()
-        missing_data_points = data['total_real_energy'].isna().sum()
         summary_text = f"""
         Energy Monitoring Report:
 
-        - Total Energy Consumption (kWh): {total_energy:,.2f}
-        - Total Cost (RM): {total_cost:,.2f}
-        - Peak Demand Observed (kW): {peak_demand:,.2f}
-        - Average Cost per Hour (RM): {avg_cost_per_hour:,.2f}
+        - Total Energy Consumption (kWh): {summary['total_energy']:,.2f}
+        - Total Cost (RM): {summary['total_cost']:,.2f}
+        - Peak Demand Observed (kW): {summary['peak_demand']:,.2f}
+        - Average Cost per Hour (RM): {summary['avg_cost_per_hour']:,.2f}
 
         Data Issues:
-        - Missing Data Points: {missing_data_points}
+        - Missing Data Points: {summary['missing_data_points']}
         """
-        plt.figure(figsize=(8.5, 11))
-        plt.text(0.1, 0.9, summary_text, fontsize=12, va='top', wrap=True)
-        plt.axis('off')
-        pdf.savefig()
-        plt.close()
+        fig.clf()
+        fig.set_size_inches(8.5, 11)
+        fig.text(0.1, 0.9, summary_text, fontsize=12, va='top', wrap=True)
+        pdf.savefig(fig)
+    plt.close(fig)
 
     print(f"Report successfully saved as {pdf_filename}")
 
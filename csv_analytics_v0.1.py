@@ -1,19 +1,30 @@
 import os
 import argparse
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch
-from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
+from sklearn.cluster import MiniBatchKMeans
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+def _read_csv_fast(file_path, **kwargs):
+    # Prefer pyarrow's multithreaded parser, falling back to the C engine when it is not installed
+    try:
+        return pd.read_csv(file_path, engine='pyarrow', **kwargs)
+    except ImportError:
+        return pd.read_csv(file_path, engine='c', low_memory=False, **kwargs)
 
 def load_data(file_path):
-    return pd.read_csv(file_path, parse_dates=['Date'])
+    return _read_csv_fast(file_path, parse_dates=['Date'])
 
 def create_output_folder(output_prefix):
     # Create a folder using the output prefix
@@ -25,22 +36,41 @@ def preprocess_data(df):
     df['DATE_ID'] = pd.to_datetime(df['DATE_ID'], format='%Y%m%d')
     return df
 
-def calculate_statistics(df):
-    numeric_columns = df.select_dtypes(include=['float64', 'int64']).columns
+def get_numeric_columns(df):
+    return df.select_dtypes(include=['float64', 'int64']).columns
+
+def calculate_statistics(df, numeric_columns):
     stats = df[numeric_columns].agg(['mean', 'median', 'std', 'min', 'max'])
     return stats
 
 def identify_outliers(df, columns, threshold=3):
-    outliers = {}
-    for column in columns:
-        z_scores = (df[column] - df[column].mean()) / df[column].std()
-        outliers[column] = df[abs(z_scores) > threshold]
-    return outliers
+    # Score every column in one pass over the numeric block
+    X = df[columns].to_numpy(dtype=np.float32)
+    z_scores = (X - np.nanmean(X, axis=0)) / np.nanstd(X, axis=0, ddof=1)
+    rows, cols = np.nonzero(np.abs(z_scores) > threshold)
+    return {column: df.iloc[rows[cols == j]] for j, column in enumerate(columns)}
+
+def _decimate(df, columns, n_out=2000):
+    # Min and max row of every column per bucket, so spikes survive at plot resolution
+    if len(df) <= n_out:
+        return df[columns]
+    Y = df[columns].to_numpy(dtype=float)
+    n = len(Y)
+    bucket = -(-n // (n_out // 2))
+    n_blocks = -(-n // bucket)
+    blocks = np.pad(Y, ((0, n_blocks * bucket - n), (0, 0)), constant_values=np.nan).reshape(n_blocks, bucket, -1)
+    offsets = (np.arange(n_blocks) * bucket)[:, None]
+    lo = np.argmin(np.where(np.isnan(blocks), np.inf, blocks), axis=1) + offsets
+    hi = np.argmax(np.where(np.isnan(blocks), -np.inf, blocks), axis=1) + offsets
+    idx = np.unique(np.concatenate([lo.ravel(), hi.ravel()]))
+    return df[columns].iloc[idx[idx < n]]
 
 def plot_time_series(df, columns, output_file):
     plt.figure(figsize=(12, 6))
+    indexed = df.set_index('Date')
     for column in columns:
-        plt.plot(df['Date'], df[column], label=column)
+        series = _decimate(indexed, [column])[column]
+        plt.plot(series.index, series.to_numpy(), label=column)
     plt.xlabel('Date')
     plt.ylabel('Value')
     plt.title('Time Series Plot')
@@ -48,20 +78,49 @@ def plot_time_series(df, columns, output_file):
     plt.savefig(output_file)
     plt.close()
 
-def plot_correlation_heatmap(df, output_file):
+def correlation_matrix(df):
+    # Pearson correlation as one float32 GEMM; NaNs are treated as the column mean
+    X = df.to_numpy(dtype=np.float32, copy=True)
+    X -= np.nanmean(X, axis=0)
+    np.nan_to_num(X, copy=False)
+    C = X.T @ X
+    d = np.sqrt(np.diag(C))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        C /= np.outer(d, d)
+    return pd.DataFrame(C, index=df.columns, columns=df.columns)
+
+def draw_correlation_heatmap(ax, corr):
+    C = corr.to_numpy()
+    im = ax.imshow(C, cmap='coolwarm', vmin=-1, vmax=1)
+    ax.figure.colorbar(im, ax=ax)
+    ax.set_xticks(range(len(corr.columns)), corr.columns, rotation=45, ha='right')
+    ax.set_yticks(range(len(corr.index)), corr.index)
+    # Annotate only the correlations worth reading instead of one text artist per cell
+    for i, j in zip(*np.nonzero(np.abs(C) > 0.3)):
+        ax.text(j, i, f"{C[i, j]:.2f}", ha='center', va='center', fontsize=7)
+
+def plot_correlation_heatmap(df, numeric_columns, output_file):
     # Select only numeric columns for correlation
-    numeric_df = df.select_dtypes(include=['float64', 'int64'])
+    numeric_df = df[numeric_columns]
     
     # Now plot the correlation heatmap only for numeric columns
-    sns.heatmap(numeric_df.corr(), annot=True, cmap='coolwarm', linewidths=0.5)
-    plt.savefig(output_file)
-    plt.close()
-
-def perform_pca(df):
-    numeric_columns = df.select_dtypes(include=['float64', 'int64']).columns
-    scaler = StandardScaler()
-    scaled_data = scaler.fit_transform(df[numeric_columns])
-    pca = PCA()
+    fig, ax = plt.subplots(figsize=(10, 8), layout='constrained')
+    draw_correlation_heatmap(ax, correlation_matrix(numeric_df))
+    fig.savefig(output_file)
+    plt.close(fig)
+
+def standardize(df, columns):
+    # Zero-mean, unit-variance float32 copy; constant columns are left at zero like StandardScaler.
+    # Row-major so PCA and k-means both consume it without another copy
+    X = np.ascontiguousarray(df[columns].to_numpy(dtype=np.float32))
+    X -= X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std == 0] = 1
+    X /= std
+    return X
+
+def perform_pca(scaled_data):
+    pca = PCA(n_components=min(10, *scaled_data.shape), svd_solver='randomized', random_state=0)
     pca_result = pca.fit_transform(scaled_data)
     return pca, pca_result
 
@@ -74,11 +133,14 @@ def plot_pca(pca, pca_result, output_file):
     plt.savefig(output_file)
     plt.close()
 
-def perform_clustering(df, n_clusters=3):
-    numeric_columns = df.select_dtypes(include=['float64', 'int64']).columns
-    scaler = StandardScaler()
-    scaled_data = scaler.fit_transform(df[numeric_columns])
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+def perform_clustering(scaled_data, n_clusters=3):
+    if faiss is not None:
+        # faiss runs Lloyd's iterations in its own SIMD C++ loop; labels come from a nearest-centroid search
+        kmeans = faiss.Kmeans(scaled_data.shape[1], n_clusters, niter=20, seed=42, verbose=False)
+        kmeans.train(scaled_data)
+        _, cluster_labels = kmeans.index.search(scaled_data, 1)
+        return cluster_labels.ravel()
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=4096, n_init=3, random_state=42)
     cluster_labels = kmeans.fit_predict(scaled_data)
     return cluster_labels
 
@@ -131,21 +193,25 @@ def main(input_file, output_prefix):
     
     df = load_data(input_file)
     df = preprocess_data(df)
+    numeric_columns = get_numeric_columns(df)
     
     # Calculate statistics and identify outliers
-    stats = calculate_statistics(df)
+    stats = calculate_statistics(df, numeric_columns)
     outliers = identify_outliers(df, ['BILLET_TEMP', 'BREAKTHOUGH_PRESSURE', 'PROFILE_EXIT_TEMP', 'RAM_SPEED'])
     
     # Generate visualizations
     plot_time_series(df, ['BILLET_TEMP', 'PROFILE_EXIT_TEMP', 'RAM_SPEED'], f'{output_folder}/time_series.png')
-    plot_correlation_heatmap(df, f'{output_folder}/correlation_heatmap.png')
+    plot_correlation_heatmap(df, numeric_columns, f'{output_folder}/correlation_heatmap.png')
     
+    # Standardize once for both PCA and clustering
+    scaled_data = standardize(df, numeric_columns)
+
     # Perform PCA
-    pca, pca_result = perform_pca(df)
+    pca, pca_result = perform_pca(scaled_data)
     plot_pca(pca, pca_result, f'{output_folder}/pca.png')
     
     # Perform clustering
-    cluster_labels = perform_clustering(df)
+    cluster_labels = perform_clustering(scaled_data)
     plot_clusters(df, cluster_labels, f'{output_folder}/clusters.png')
     
     # Generate PDF report
@@ -1,38 +1,93 @@
 import argparse
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # figures only go to PDF, and pool workers have no display
 import matplotlib.pyplot as plt
-import seaborn as sns
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, PageBreak, Image
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import io
+import numpy as np
+import warnings
+
+def _read_csv_fast(file_path, **kwargs):
+    # Prefer pyarrow's multithreaded parser, falling back to the C engine when it is not installed
+    try:
+        return pd.read_csv(file_path, engine='pyarrow', **kwargs)
+    except ImportError:
+        return pd.read_csv(file_path, engine='c', low_memory=False, **kwargs)
 
 def load_data(file_path):
     # Load CSV file and preprocess data
-    df = pd.read_csv(file_path, parse_dates=['Date'])
+    df = _read_csv_fast(file_path, parse_dates=['Date'])
     df.set_index('Date', inplace=True)
     return df
 
 def generate_statistical_summary(df):
-    # Calculate and return statistical summary
-    return df.describe()
+    # Calculate and return statistical summary: the rows of describe(), from NumPy reductions on the numeric block
+    numeric_df = df.select_dtypes(include=[np.number])
+    arr = numeric_df.to_numpy(dtype=float)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns simply yield NaN
+        rows = np.vstack([np.count_nonzero(~np.isnan(arr), axis=0), np.nanmean(arr, axis=0), np.nanstd(arr, axis=0, ddof=1),
+                          np.nanmin(arr, axis=0), np.nanpercentile(arr, [25, 50, 75], axis=0), np.nanmax(arr, axis=0)])
+    return pd.DataFrame(rows, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'], columns=numeric_df.columns)
+
+def _decimate(df, columns, n_out=2000):
+    # Min and max row of every column per bucket, so spikes survive at plot resolution
+    if len(df) <= n_out:
+        return df[columns]
+    Y = df[columns].to_numpy(dtype=float)
+    n = len(Y)
+    bucket = -(-n // (n_out // 2))
+    n_blocks = -(-n // bucket)
+    blocks = np.pad(Y, ((0, n_blocks * bucket - n), (0, 0)), constant_values=np.nan).reshape(n_blocks, bucket, -1)
+    offsets = (np.arange(n_blocks) * bucket)[:, None]
+    lo = np.argmin(np.where(np.isnan(blocks), np.inf, blocks), axis=1) + offsets
+    hi = np.argmax(np.where(np.isnan(blocks), -np.inf, blocks), axis=1) + offsets
+    idx = np.unique(np.concatenate([lo.ravel(), hi.ravel()]))
+    return df[columns].iloc[idx[idx < n]]
 
 def plot_time_series(df, columns):
     # Create time series plots for specified columns
     fig, axes = plt.subplots(len(columns), 1, figsize=(10, 4*len(columns)))
     for i, col in enumerate(columns):
-        df[col].plot(ax=axes[i] if len(columns) > 1 else axes)
-        (axes[i] if len(columns) > 1 else axes).set_title(col)
+        ax = axes[i] if len(columns) > 1 else axes
+        series = _decimate(df, [col])[col]
+        ax.plot(series.index, series.to_numpy())
+        ax.set_title(col)
     plt.tight_layout()
     return fig
 
+def correlation_matrix(df):
+    # Pearson correlation as one float32 GEMM; NaNs are treated as the column mean
+    X = df.to_numpy(dtype=np.float32, copy=True)
+    X -= np.nanmean(X, axis=0)
+    np.nan_to_num(X, copy=False)
+    C = X.T @ X
+    d = np.sqrt(np.diag(C))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        C /= np.outer(d, d)
+    return pd.DataFrame(C, index=df.columns, columns=df.columns)
+
+def draw_correlation_heatmap(ax, corr):
+    C = corr.to_numpy()
+    im = ax.imshow(C, cmap='coolwarm', vmin=-1, vmax=1)
+    ax.figure.colorbar(im, ax=ax)
+    ax.set_xticks(range(len(corr.columns)), corr.columns, rotation=45, ha='right')
+    ax.set_yticks(range(len(corr.index)), corr.index)
+    # Annotate only the correlations worth reading instead of one text artist per cell
+    for i, j in zip(*np.nonzero(np.abs(C) > 0.3)):
+        ax.text(j, i, f"{C[i, j]:.2f}", ha='center', va='center', fontsize=7)
+
 def create_correlation_heatmap(df):
     # Create correlation matrix and heatmap
-    corr = df.corr()
-    fig, ax = plt.subplots(figsize=(10, 8))
-    sns.heatmap(corr, annot=True, cmap='coolwarm', ax=ax)
+    corr = correlation_matrix(df.select_dtypes(include=[np.number]))
+    fig, ax = plt.subplots(figsize=(10, 8), layout='constrained')
+    draw_correlation_heatmap(ax, corr)
     return fig
 
 def create_scatter_plot(df, x_col, y_col):
@@ -45,9 +100,14 @@ def figure_to_image(fig):
     # Convert matplotlib figure to ReportLab Image
     img_data = io.BytesIO()
     fig.savefig(img_data, format='png')
+    plt.close(fig)  # the PNG holds everything the report needs
     img_data.seek(0)
     return Image(img_data)
 
+def format_values(values):
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isnan(values), "N/A", np.char.mod("%.2f", values))
+
 def generate_pdf_report(output_file, stats, figures):
     # Generate PDF report using ReportLab
     doc = SimpleDocTemplate(output_file, pagesize=A4)
@@ -56,7 +116,8 @@ def generate_pdf_report(output_file, stats, figures):
 
     # Add statistical summary
     story.append(Paragraph("Statistical Summary", styles['Heading1']))
-    data = [stats.reset_index().columns.tolist()] + stats.reset_index().values.tolist()
+    data = [['index'] + list(stats.columns)]
+    data.extend(np.column_stack([stats.index.astype(str), format_values(stats.to_numpy())]).tolist())
     table = Table(data)
     table.setStyle(TableStyle([
         ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
@@ -108,7 +169,36 @@ def analyze_profile(input_file, output_dir):
     
     print(f"Analysis complete. Report saved as: {output_file}")
 
-def main(output_dir):
+def analyze_profiles(input_files, output_dir):
+    # Profiles are independent, so each file is analyzed in its own process; a file that fails is reported and skipped
+    failed = []
+    with ProcessPoolExecutor(max_workers=min(len(input_files), os.cpu_count() or 1)) as executor:
+        futures = {executor.submit(analyze_profile, input_file, output_dir): input_file for input_file in input_files}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failed.append(futures[future])
+                print(f"Error analyzing '{futures[future]}': {e}")
+
+    print(f"Analyzed {len(input_files) - len(failed)} of {len(input_files)} files.")
+    for input_file in sorted(failed):
+        print(f"Failed: {input_file}")
+
+def main(output_dir, input_files=None):
+    if input_files:
+        valid_files = []
+        for input_file in input_files:
+            if not os.path.exists(input_file):
+                print(f"Error: File '{input_file}' does not exist. Skipping.")
+            elif not input_file.endswith('.csv'):
+                print(f"Error: '{input_file}' is not a CSV file. Skipping.")
+            else:
+                valid_files.append(input_file)
+        if valid_files:
+            analyze_profiles(valid_files, output_dir)
+        return
+
     while True:
         input_file = input("Please enter the full path of the CSV file you want to analyze (or 'q' to quit): ").strip()
         
@@ -134,6 +224,7 @@ def main(output_dir):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Analyze aluminum extrusion data")
     parser.add_argument("--output_dir", default="D:\\Csv analytics\\analysis_output", help="Path to output directory")
+    parser.add_argument("--inputs", nargs='+', help="CSV files to analyze in parallel instead of prompting")
     args = parser.parse_args()
 
-    main(args.output_dir)
\ No newline at end of file
+    main(args.output_dir, args.inputs)
\ No newline at end of file
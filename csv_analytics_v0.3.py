@@ -1,20 +1,63 @@
 import argparse
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # figures only go to PDF, and pool workers have no display
 import matplotlib.pyplot as plt
-import seaborn as sns
 from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, PageBreak, Image
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, PageBreak, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from PIL import Image as PILImage
 import os
-import io
-from scipy import stats
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import traceback
+import warnings
 import numpy as np
 
-def load_data(file_path):
-    df = pd.read_csv(file_path)
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except ImportError:
+    pa = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+NUMERIC_COLUMNS = ['BILLET_TEMP', 'BREAKTHOUGH_PRESSURE', 'PROFILE_EXIT_TEMP', 'RAM_SPEED', 'EXT_TIME', 'MAIN_RAM_PRESSURE']
+NUMERIC_DTYPES = {col: np.float32 for col in NUMERIC_COLUMNS}
+
+def _read_csv_fast(file_path):
+    # Only the columns the report uses are parsed, with their types given up front
+    header = pd.read_csv(file_path, nrows=0).columns
+    usecols = [col for col in ['Date'] + NUMERIC_COLUMNS if col in header]
+    dtypes = {col: dtype for col, dtype in NUMERIC_DTYPES.items() if col in header}
+
+    # Parse with pyarrow's multithreaded reader, falling back to the pandas C engine
+    if pa is not None:
+        convert_options = pacsv.ConvertOptions(
+            include_columns=usecols,
+            column_types={col: pa.float32() for col in dtypes},
+            timestamp_parsers=['%d/%m/%Y %H:%M'],
+        )
+        # Memory-map the file so the page cache backs the parse, in 64 MB blocks per reader thread
+        read_options = pacsv.ReadOptions(block_size=64 << 20)
+        try:
+            with pa.memory_map(file_path, 'r') as source:
+                table = pacsv.read_csv(source, read_options=read_options, convert_options=convert_options)
+            return table.to_pandas(split_blocks=True, self_destruct=True)
+        except pa.ArrowInvalid:
+            pass  # Non-numeric sensor values; let pandas coerce them below
+    try:
+        return pd.read_csv(file_path, usecols=usecols, dtype=dtypes, engine='c')
+    except ValueError:
+        return pd.read_csv(file_path, usecols=usecols, engine='c', low_memory=False)
+
+def parse_csv(file_path):
+    df = _read_csv_fast(file_path)
     print("Columns in the CSV file:", df.columns.tolist())
     print("\nSample data:")
     print(df.head())
@@ -23,45 +66,132 @@ def load_data(file_path):
     
     # Convert 'Date' column to datetime if it exists
     if 'Date' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'], format='%d/%m/%Y %H:%M', errors='coerce')
+        df['Date'] = pd.to_datetime(df['Date'], format='%d/%m/%Y %H:%M', errors='coerce', cache=True)
         df.set_index('Date', inplace=True)
     
     # Convert numeric columns to float, ignoring non-numeric values
-    numeric_columns = ['BILLET_TEMP', 'BREAKTHOUGH_PRESSURE', 'PROFILE_EXIT_TEMP', 'RAM_SPEED', 'EXT_TIME', 'MAIN_RAM_PRESSURE']
-    for col in numeric_columns:
+    for col in NUMERIC_COLUMNS:
         if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-    
+            df[col] = pd.to_numeric(df[col], errors='coerce', downcast='float')
     return df
 
-def generate_statistical_summary(df):
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    summary = df[numeric_cols].describe()
-    summary.loc['range'] = summary.loc['max'] - summary.loc['min']
-    return summary
+def load_data(file_path):
+    # A Parquet sidecar newer than the CSV holds the already-typed frame from a previous run
+    cache_path = file_path + '.parquet'
+    if pa is not None and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+        print(f"Loading cached data: {cache_path}")
+        df = pd.read_parquet(cache_path, engine='pyarrow')
+    else:
+        df = parse_csv(file_path)
+        if pa is not None:
+            try:
+                df.to_parquet(cache_path, engine='pyarrow', compression='zstd', row_group_size=64_000)
+            except OSError as e:
+                print(f"Could not write data cache {cache_path}: {e}")
+    
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    return df, numeric_cols
+
+def numeric_block(df, numeric_cols):
+    return np.asfortranarray(df[numeric_cols].to_numpy(dtype=np.float32))
+
+def _summary_stats(X):
+    # Every per-column statistic the report needs, computed once and shared by the later steps
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns simply yield NaN
+        count = np.count_nonzero(~np.isnan(X), axis=0)
+        mean = np.nanmean(X, axis=0, dtype=np.float64)
+        std = np.nanstd(X, axis=0, dtype=np.float64, ddof=1)
+        quartiles = np.nanquantile(X, [0.25, 0.5, 0.75], axis=0)
+        return count, mean, std, np.nanmin(X, axis=0), quartiles, np.nanmax(X, axis=0)
+
+def generate_statistical_summary(summary, numeric_cols):
+    count, mean, std, minimum, quartiles, maximum = summary
+    rows = np.vstack([count, mean, std, minimum, quartiles, maximum, maximum - minimum])
+    return pd.DataFrame(rows, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max', 'range'], columns=numeric_cols)
 
-def detect_outliers(df):
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _zscore_mask(X, mean, std, out, threshold):
+        # One column per thread; NaN readings and columns without a usable std are never flagged
+        n, p = X.shape
+        for j in prange(p):
+            if not std[j] > 0:
+                continue
+            for i in range(n):
+                out[i, j] = abs(X[i, j] - mean[j]) / std[j] > threshold
+
+def detect_outliers(df, numeric_cols, X, summary, threshold=3):
+    count, mean, std = summary[:3]
+    # z-scores use the population std, as scipy.stats.zscore did
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = std * np.sqrt((count - 1) / count)
+    std = np.where(std > 0, std, np.nan)
+    if njit is not None:
+        mask = np.zeros(X.shape, dtype=np.bool_)
+        _zscore_mask(X, mean, std, mask, threshold)
+    else:
+        with np.errstate(invalid='ignore'):
+            mask = np.abs(X - mean) / std > threshold
+    # Flagged readings go straight to the report's string columns; columns without outliers are left out
     outliers = {}
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    for column in numeric_cols:
-        z_scores = stats.zscore(df[column].dropna())
-        outliers[column] = df[column][abs(z_scores) > 3]
+    for j, column in enumerate(numeric_cols):
+        flagged = mask[:, j]
+        if flagged.any():
+            outliers[column] = (format_timestamps(df.index[flagged]), format_values(X[flagged, j]))
     return outliers
 
+def _decimate(df, columns, n_out=2000):
+    # Min and max row of every column per bucket, so spikes survive at plot resolution
+    if len(df) <= n_out:
+        return df[columns]
+    Y = df[columns].to_numpy(dtype=float)
+    n = len(Y)
+    bucket = -(-n // (n_out // 2))
+    n_blocks = -(-n // bucket)
+    blocks = np.pad(Y, ((0, n_blocks * bucket - n), (0, 0)), constant_values=np.nan).reshape(n_blocks, bucket, -1)
+    offsets = (np.arange(n_blocks) * bucket)[:, None]
+    lo = np.argmin(np.where(np.isnan(blocks), np.inf, blocks), axis=1) + offsets
+    hi = np.argmax(np.where(np.isnan(blocks), -np.inf, blocks), axis=1) + offsets
+    idx = np.unique(np.concatenate([lo.ravel(), hi.ravel()]))
+    return df[columns].iloc[idx[idx < n]]
+
 def plot_time_series(df, columns):
     fig, axes = plt.subplots(len(columns), 1, figsize=(10, 4*len(columns)))
     for i, col in enumerate(columns):
         ax = axes[i] if len(columns) > 1 else axes
-        df[col].plot(ax=ax)
+        series = _decimate(df, [col])[col]
+        ax.plot(series.index, series.to_numpy())
         ax.set_title(col)
         ax.set_ylabel(get_units(col))
     plt.tight_layout()
     return fig
 
+def correlation_matrix(df):
+    # Pearson correlation as one float32 GEMM; NaNs are treated as the column mean
+    X = df.to_numpy(dtype=np.float32, copy=True)
+    X -= np.nanmean(X, axis=0)
+    np.nan_to_num(X, copy=False)
+    C = X.T @ X
+    d = np.sqrt(np.diag(C))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        C /= np.outer(d, d)
+    return pd.DataFrame(C, index=df.columns, columns=df.columns)
+
+def draw_correlation_heatmap(ax, corr):
+    C = corr.to_numpy()
+    im = ax.imshow(C, cmap='coolwarm', vmin=-1, vmax=1)
+    ax.figure.colorbar(im, ax=ax)
+    ax.set_xticks(range(len(corr.columns)), corr.columns, rotation=45, ha='right')
+    ax.set_yticks(range(len(corr.index)), corr.index)
+    # Annotate only the correlations worth reading instead of one text artist per cell
+    for i, j in zip(*np.nonzero(np.abs(C) > 0.3)):
+        ax.text(j, i, f"{C[i, j]:.2f}", ha='center', va='center', fontsize=7)
+
 def create_correlation_heatmap(df):
-    corr = df.corr()
-    fig, ax = plt.subplots(figsize=(10, 8))
-    sns.heatmap(corr, annot=True, cmap='coolwarm', ax=ax, fmt='.2f')
+    corr = correlation_matrix(df)
+    fig, ax = plt.subplots(figsize=(10, 8), layout='constrained')
+    draw_correlation_heatmap(ax, corr)
     ax.set_title("Correlation Heatmap")
     return fig
 
@@ -73,11 +203,25 @@ def create_scatter_plot(df, x_col, y_col):
     ax.set_title(f"{y_col} vs {x_col}")
     return fig
 
+class FigureImage(Flowable):
+    """Draws an already rendered image at a fixed size; platypus.Image only accepts files."""
+
+    def __init__(self, image, width, height):
+        super().__init__()
+        self.image = image
+        self.width = width
+        self.height = height
+
+    def draw(self):
+        self.canv.drawImage(self.image, 0, 0, width=self.width, height=self.height)
+
 def figure_to_image(fig):
-    img_data = io.BytesIO()
-    fig.savefig(img_data, format='png', dpi=300, bbox_inches='tight')
-    img_data.seek(0)
-    return Image(img_data, width=6*inch, height=4*inch)
+    # Hand the rendered Agg pixels straight to ReportLab instead of encoding and re-decoding a PNG
+    fig.set_dpi(150)
+    fig.canvas.draw()
+    pixels = np.ascontiguousarray(np.asarray(fig.canvas.buffer_rgba())[..., :3])
+    plt.close(fig)  # the pixel copy holds everything the report needs
+    return FigureImage(ImageReader(PILImage.fromarray(pixels)), width=6*inch, height=4*inch)
 
 def get_units(parameter):
     units = {
@@ -90,18 +234,17 @@ def get_units(parameter):
     }
     return units.get(parameter, '')
 
-def format_value(value):
-    if isinstance(value, pd.Series):
-        return value.apply(format_value)
-    if pd.isna(value):
-        return "N/A"
-    elif isinstance(value, (int, float)):
-        return f"{value:.2f}"
-    return str(value)
+def format_values(values):
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isnan(values), "N/A", np.char.mod("%.2f", values))
+
+def format_timestamps(index):
+    text = index.strftime('%Y-%m-%d %H:%M:%S') if isinstance(index, pd.DatetimeIndex) else index.astype(str)
+    return np.where(index.isna(), "N/A", text)
 
-def create_table(data):
-    formatted_data = [[format_value(cell) for cell in row] for row in data]
-    return Table(formatted_data)
+def create_table(header, *columns):
+    # Columns arrive pre-formatted as string arrays and are stacked into rows in one go
+    return Table([header] + np.column_stack(columns).tolist())
 
 def generate_pdf_report(output_file, df, stats, figures, outliers):
     doc = SimpleDocTemplate(output_file, pagesize=A4)
@@ -124,11 +267,7 @@ def generate_pdf_report(output_file, df, stats, figures, outliers):
 
     # Statistical Summary
     story.append(Paragraph("Statistical Summary", styles['Heading1']))
-    summary_data = [['Statistic'] + list(stats.columns)]
-    for index, row in stats.iterrows():
-        summary_data.append([index] + [format_value(x) for x in row])
-    
-    table = create_table(summary_data)
+    table = create_table(['Statistic'] + list(stats.columns), stats.index.astype(str), format_values(stats.to_numpy()))
     table.setStyle(TableStyle([
         ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -157,28 +296,26 @@ def generate_pdf_report(output_file, df, stats, figures, outliers):
 
     # Outliers
     story.append(Paragraph("Outlier Analysis", styles['Heading2']))
-    for param, values in outliers.items():
-        if not values.empty:
-            story.append(Paragraph(f"Potential outliers in {param}:", styles['Heading3']))
-            outlier_data = [[index, format_value(value)] for index, value in values.items()]
-            outlier_table = create_table([['Timestamp', f'{param} ({get_units(param)})']] + outlier_data)
-            outlier_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ('TOPPADDING', (0, 1), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            story.append(outlier_table)
+    for param, (timestamps, values) in outliers.items():
+        story.append(Paragraph(f"Potential outliers in {param}:", styles['Heading3']))
+        outlier_table = create_table(['Timestamp', f'{param} ({get_units(param)})'], timestamps, values)
+        outlier_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('TOPPADDING', (0, 1), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        story.append(outlier_table)
     try:
         doc.build(story)
         print(f"PDF report generated successfully: {output_file}")
@@ -188,17 +325,18 @@ def generate_pdf_report(output_file, df, stats, figures, outliers):
 
 def analyze_profile(input_file, output_dir):
     try:
-        df = load_data(input_file)
+        df, numeric_cols = load_data(input_file)
         profile = os.path.splitext(os.path.basename(input_file))[0]
         profile_dir = os.path.join(output_dir, profile)
         os.makedirs(profile_dir, exist_ok=True)
 
         print("Generating statistical summary...")
-        stats = generate_statistical_summary(df)
+        X = numeric_block(df, numeric_cols)
+        summary = _summary_stats(X)
+        stats = generate_statistical_summary(summary, numeric_cols)
         print("Detecting outliers...")
-        outliers = detect_outliers(df)
+        outliers = detect_outliers(df, numeric_cols, X, summary)
         
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
         time_series_cols = [col for col in ['BILLET_TEMP', 'PROFILE_EXIT_TEMP', 'RAM_SPEED', 'BREAKTHOUGH_PRESSURE'] if col in numeric_cols]
         
         print("Creating figures...")
@@ -219,7 +357,36 @@ def analyze_profile(input_file, output_dir):
         print("Detailed error information:")
         print(traceback.format_exc())
 
-def main(output_dir):
+def analyze_profiles(input_files, output_dir):
+    # Profiles are independent, so each file is analyzed in its own process; a file that fails is reported and skipped
+    failed = []
+    with ProcessPoolExecutor(max_workers=min(len(input_files), os.cpu_count() or 1)) as executor:
+        futures = {executor.submit(analyze_profile, input_file, output_dir): input_file for input_file in input_files}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failed.append(futures[future])
+                print(f"Error analyzing '{futures[future]}': {e}")
+
+    print(f"Analyzed {len(input_files) - len(failed)} of {len(input_files)} files.")
+    for input_file in sorted(failed):
+        print(f"Failed: {input_file}")
+
+def main(output_dir, input_files=None):
+    if input_files:
+        valid_files = []
+        for input_file in input_files:
+            if not os.path.exists(input_file):
+                print(f"Error: File '{input_file}' does not exist. Skipping.")
+            elif not input_file.endswith('.csv'):
+                print(f"Error: '{input_file}' is not a CSV file. Skipping.")
+            else:
+                valid_files.append(input_file)
+        if valid_files:
+            analyze_profiles(valid_files, output_dir)
+        return
+
     while True:
         input_file = input("Please enter the full path of the CSV file you want to analyze (or 'q' to quit): ").strip()
         
@@ -245,6 +412,7 @@ def main(output_dir):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Analyze aluminum extrusion data")
     parser.add_argument("--output_dir", default="D:\\Csv analytics\\analysis_output", help="Path to output directory")
+    parser.add_argument("--inputs", nargs='+', help="CSV files to analyze in parallel instead of prompting")
     args = parser.parse_args()
 
-    main(args.output_dir)
\ No newline at end of file
+    main(args.output_dir, args.inputs)
\ No newline at end of file
@@ -1,64 +1,155 @@
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # figures are only rendered into the PDF
 import matplotlib.pyplot as plt
-import seaborn as sns
 from reportlab.lib.pagesizes import landscape, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, PageBreak, Image
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, PageBreak, Flowable
+from reportlab.lib.utils import ImageReader
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 import os
+import glob
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import io
-from scipy import stats
 import numpy as np
 import argparse
+import warnings
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Sensor columns used by the report, parsed straight to float32; everything else is skipped
+SENSOR_DTYPES = {
+    'BILLET_TEMP': 'float32',
+    'PROFILE_EXIT_TEMP': 'float32',
+    'RAM_SPEED': 'float32',
+    'EXT_TIME': 'float32',
+    'BREAKTHOUGH_PRESSURE': 'float32',
+    'MAIN_RAM_PRESSURE': 'float32'
+}
+
+# Rows parsed per chunk when reading large logs
+CHUNK_SIZE = 200_000
 
 def load_data(file_path):
-    df = pd.read_csv(file_path)
+    # The pyarrow engine takes no usecols callable, so the projection is resolved from the header
+    header = pd.read_csv(file_path, nrows=0).columns
+    usecols = [col for col in header if col == 'Date' or col in SENSOR_DTYPES]
+    dtypes = {col: SENSOR_DTYPES[col] for col in usecols if col != 'Date'}
+    try:
+        try:
+            # pyarrow parses on several threads straight into the typed columns
+            df = pd.read_csv(file_path, usecols=usecols, dtype=dtypes, engine='pyarrow')
+        except ImportError:
+            # Typed chunks keep only one chunk's parser buffers alive at a time
+            reader = pd.read_csv(file_path, usecols=usecols, dtype=dtypes, engine='c', chunksize=CHUNK_SIZE)
+            df = pd.concat(reader, ignore_index=True)
+    except ValueError:
+        # Non-numeric sensor values (ArrowInvalid is a ValueError); read untyped and let pandas coerce them
+        df = pd.read_csv(file_path, usecols=usecols, engine='c', low_memory=False)
+        for col in dtypes:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
     if 'Date' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'], format='%d/%m/%y %H:%M')
+        df['Date'] = pd.to_datetime(df['Date'], format='%d/%m/%y %H:%M', cache=True)
         df.set_index('Date', inplace=True)
     return df
 
-def generate_statistical_summary(df):
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    summary = df[numeric_cols].describe()
-    summary.loc['range'] = summary.loc['max'] - summary.loc['min']
-    return summary
+def _summary_stats(X):
+    # Every per-column statistic the report needs, computed once and shared by the later steps
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns simply yield NaN
+        count = np.count_nonzero(~np.isnan(X), axis=0)
+        mean = np.nanmean(X, axis=0, dtype=np.float64)
+        std = np.nanstd(X, axis=0, dtype=np.float64, ddof=1)
+        quartiles = np.nanquantile(X, [0.25, 0.5, 0.75], axis=0)
+        return count, mean, std, np.nanmin(X, axis=0), quartiles, np.nanmax(X, axis=0)
+
+def generate_statistical_summary(summary, numeric_cols):
+    count, mean, std, minimum, quartiles, maximum = summary
+    rows = np.vstack([count, mean, std, minimum, quartiles, maximum, maximum - minimum])
+    return pd.DataFrame(rows, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max', 'range'], columns=numeric_cols)
 
-def detect_outliers(df, threshold=3):
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _zscore_mask(X, mean, std, out, threshold):
+        # One column per thread; NaN readings and columns without a usable std are never flagged
+        n, p = X.shape
+        for j in prange(p):
+            if not std[j] > 0:
+                continue
+            for i in range(n):
+                out[i, j] = abs(X[i, j] - mean[j]) / std[j] > threshold
+
+def detect_outliers(numeric_df, X, summary, threshold=3):
+    count, mean, std = summary[:3]
+    # z-scores use the population std, as scipy.stats.zscore did
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = std * np.sqrt((count - 1) / count)
+    std = np.where(std > 0, std, np.nan)
+    if njit is not None:
+        mask = np.zeros(X.shape, dtype=np.bool_)
+        _zscore_mask(X, mean, std, mask, threshold)
+    else:
+        with np.errstate(invalid='ignore'):
+            mask = np.abs(X - mean) / std > threshold
+    # Flagged readings go straight to the report's string columns; columns without outliers are left out
     outliers = {}
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    for column in numeric_cols:
-        z_scores = np.abs(stats.zscore(df[column]))
-        outliers[column] = df[column][z_scores > threshold]
+    for j, column in enumerate(numeric_df.columns):
+        flagged = mask[:, j]
+        if flagged.any():
+            outliers[column] = (format_timestamps(numeric_df.index[flagged]), format_values(X[flagged, j]))
     return outliers
 
-def plot_time_series(df, columns):
-    available_columns = [col for col in columns if col in df.columns and np.issubdtype(df[col].dtype, np.number)]
+def _decimate(df, columns, n_out=2000):
+    # Min and max row of every column per bucket, so spikes survive at plot resolution
+    if len(df) <= n_out:
+        return df[columns]
+    Y = df[columns].to_numpy(dtype=float)
+    n = len(Y)
+    bucket = -(-n // (n_out // 2))
+    n_blocks = -(-n // bucket)
+    blocks = np.pad(Y, ((0, n_blocks * bucket - n), (0, 0)), constant_values=np.nan).reshape(n_blocks, bucket, -1)
+    offsets = (np.arange(n_blocks) * bucket)[:, None]
+    lo = np.argmin(np.where(np.isnan(blocks), np.inf, blocks), axis=1) + offsets
+    hi = np.argmax(np.where(np.isnan(blocks), -np.inf, blocks), axis=1) + offsets
+    idx = np.unique(np.concatenate([lo.ravel(), hi.ravel()]))
+    return df[columns].iloc[idx[idx < n]]
+
+def plot_time_series(df, columns, numeric_cols):
+    available_columns = [col for col in columns if col in numeric_cols]
     if not available_columns:
         return None
     
-    fig, axes = plt.subplots(len(available_columns), 1, figsize=(10, 4*len(available_columns)))
-    if len(available_columns) == 1:
-        axes = [axes]
-    
-    for i, col in enumerate(available_columns):
-        df[col].plot(ax=axes[i])
-        axes[i].set_title(col)
-        axes[i].set_ylabel(get_units(col))
-    plt.tight_layout()
+    # One pandas plotting call lays out every subplot; only the labels are set per axis
+    axes = _decimate(df, available_columns).plot(subplots=True, sharex=False, legend=False, figsize=(10, 4*len(available_columns)))
+    for ax, col in zip(axes, available_columns):
+        ax.set_title(col)
+        ax.set_ylabel(get_units(col))
+    fig = axes[0].figure
+    fig.tight_layout()
     return fig
 
-def create_correlation_heatmap(df):
-    # Select only numeric columns
-    numeric_df = df.select_dtypes(include=[np.number])
-    
-    if numeric_df.empty:
+def correlation_matrix(X, mean, columns):
+    # Pearson correlation as one float32 GEMM; NaNs are treated as the column mean
+    X = np.nan_to_num(X - mean.astype(np.float32), copy=False)
+    C = X.T @ X
+    d = np.sqrt(np.diag(C))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        C /= np.outer(d, d)
+    return pd.DataFrame(C, index=columns, columns=columns)
+
+def create_correlation_heatmap(X, mean, numeric_cols):
+    if not numeric_cols:
         return None  # Return None if there are no numeric columns
+    import seaborn as sns
     
-    corr = numeric_df.corr()
+    corr = correlation_matrix(X, mean, numeric_cols)
     fig, ax = plt.subplots(figsize=(10, 8))
-    sns.heatmap(corr, annot=True, cmap='coolwarm', ax=ax, fmt='.2f')
+    # Per-cell annotations dominate rendering on wide frames, so only label small matrices
+    sns.heatmap(corr, annot=len(numeric_cols) <= 10, cmap='coolwarm', ax=ax, fmt='.2f')
     ax.set_title("Correlation Heatmap")
     return fig
 
@@ -70,27 +161,29 @@ def create_scatter_plot(df, x_col, y_col):
     ax.set_title(f"{y_col} vs {x_col}")
     return fig
 
+_UNITS = {
+    'BILLET_TEMP': '°C',
+    'PROFILE_EXIT_TEMP': '°C',
+    'RAM_SPEED': 'mm/s',
+    'EXT_TIME': 's',
+    'BREAKTHOUGH_PRESSURE': 'MPa',
+    'MAIN_RAM_PRESSURE': 'MPa'
+}
+
 def get_units(parameter):
-    units = {
-        'BILLET_TEMP': '°C',
-        'PROFILE_EXIT_TEMP': '°C',
-        'RAM_SPEED': 'mm/s',
-        'EXT_TIME': 's',
-        'BREAKTHOUGH_PRESSURE': 'MPa',
-        'MAIN_RAM_PRESSURE': 'MPa'
-    }
-    return units.get(parameter, '')
+    return _UNITS.get(parameter, '')
 
-def create_extrusion_pressure_plot(df):
+def create_extrusion_pressure_plot(df, numeric_cols):
     pressure_columns = ['BREAKTHOUGH_PRESSURE', 'MAIN_RAM_PRESSURE']
-    available_columns = [col for col in pressure_columns if col in df.columns and np.issubdtype(df[col].dtype, np.number)]
+    available_columns = [col for col in pressure_columns if col in numeric_cols]
     
     if not available_columns:
         return None
     
     fig, ax = plt.subplots(figsize=(12, 6))
+    data = _decimate(df, available_columns)
     for col in available_columns:
-        ax.plot(df.index, df[col], label=col)
+        ax.plot(data.index, data[col], label=col)
     ax.set_xlabel('Time')
     ax.set_ylabel('Pressure (MPa)')
     ax.set_title('Extrusion Pressure Over Time')
@@ -99,6 +192,31 @@ def create_extrusion_pressure_plot(df):
     plt.tight_layout()
     return fig
 
+def format_values(values):
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isnan(values), "N/A", np.char.mod("%.2f", values))
+
+def format_timestamps(index):
+    text = index.strftime('%Y-%m-%d %H:%M:%S') if isinstance(index, pd.DatetimeIndex) else index.astype(str)
+    return np.where(index.isna(), "N/A", text)
+
+class LazyFigureImage(Flowable):
+    """Renders its figure to PNG only when the page is drawn, so one image buffer is alive at a time."""
+
+    def __init__(self, fig, width, height):
+        super().__init__()
+        self.fig = fig
+        self.width = width
+        self.height = height
+
+    def draw(self):
+        img_data = io.BytesIO()
+        self.fig.savefig(img_data, format='png', dpi=150, pil_kwargs={'compress_level': 1})
+        img_data.seek(0)
+        self.canv.drawImage(ImageReader(img_data), 0, 0, width=self.width, height=self.height)
+        img_data.close()
+        plt.close(self.fig)
+
 def generate_pdf_report(output_file, df, stats, figures, outliers):
     doc = SimpleDocTemplate(output_file, pagesize=landscape(A4))
     story = []
@@ -126,7 +244,7 @@ def generate_pdf_report(output_file, df, stats, figures, outliers):
 
     for half in [first_half, second_half]:
         data = [['Statistic'] + half]
-        data.extend(stats[half].reset_index().values.tolist())
+        data.extend(np.column_stack([stats.index.astype(str), format_values(stats[half].to_numpy())]).tolist())
         t = Table(data)
         t.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
@@ -146,64 +264,58 @@ def generate_pdf_report(output_file, df, stats, figures, outliers):
     # Figures
     for title, fig in figures.items():
         story.append(Paragraph(title, styles['Heading2']))
-        img_data = io.BytesIO()
-        fig.savefig(img_data, format='png', dpi=300, bbox_inches='tight')
-        img_data.seek(0)
-        img = Image(img_data, width=8*inch, height=5*inch)
-        story.append(img)
+        story.append(LazyFigureImage(fig, width=8*inch, height=5*inch))
         story.append(PageBreak())
 
     # Outlier Analysis
     story.append(Paragraph("Outlier Analysis", styles['Heading2']))
-    for col, values in outliers.items():
-        if not values.empty:
-            story.append(Paragraph(f"Outliers in {col}:", styles['Heading3']))
-            data = [['Timestamp', f'{col} ({get_units(col)})']]
-            data.extend(values.reset_index().values.tolist())
-            t = Table(data)
-            t.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            story.append(t)
-            story.append(PageBreak())
+    for col, (timestamps, values) in outliers.items():
+        story.append(Paragraph(f"Outliers in {col}:", styles['Heading3']))
+        data = [['Timestamp', f'{col} ({get_units(col)})']]
+        data.extend(np.column_stack([timestamps, values]).tolist())
+        t = Table(data)
+        t.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        story.append(t)
+        story.append(PageBreak())
 
     doc.build(story)
 
-def create_extrusion_pressure_plot(df):
-    fig, ax = plt.subplots(figsize=(12, 6))
-    ax.plot(df.index, df['BREAKTHOUGH_PRESSURE'], label='Breakthrough Pressure')
-    ax.plot(df.index, df['MAIN_RAM_PRESSURE'], label='Main Ram Pressure')
-    ax.set_xlabel('Time')
-    ax.set_ylabel('Pressure (MPa)')
-    ax.set_title('Extrusion Pressure Over Time')
-    ax.legend()
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    return fig
-
 def analyze_profile(input_file, output_dir):
     df = load_data(input_file)
     profile = os.path.splitext(os.path.basename(input_file))[0]
     profile_dir = os.path.join(output_dir, profile)
     os.makedirs(profile_dir, exist_ok=True)
 
-    stats = generate_statistical_summary(df)
-    outliers = detect_outliers(df)
+    # Numeric projection shared by every analysis step below
+    numeric_df = df.select_dtypes(include=[np.number])
+    numeric_cols = numeric_df.columns.tolist()
+    # One float32 copy of the numeric block drives the summary, outliers and correlations
+    X = np.asfortranarray(numeric_df.to_numpy(dtype=np.float32))
+    summary = _summary_stats(X)
+
+    stats = generate_statistical_summary(summary, numeric_cols)
+    outliers = detect_outliers(numeric_df, X, summary)
     
     figures = {
-        "Time Series": plot_time_series(df, ['BILLET_TEMP', 'PROFILE_EXIT_TEMP', 'RAM_SPEED', 'BREAKTHOUGH_PRESSURE']),
-        "Extrusion Pressure Over Time": create_extrusion_pressure_plot(df)
+        "Time Series": plot_time_series(df, ['BILLET_TEMP', 'PROFILE_EXIT_TEMP', 'RAM_SPEED', 'BREAKTHOUGH_PRESSURE'], numeric_cols)
     }
     
+    # Only add the pressure plot if the pressure columns are present
+    pressure_plot = create_extrusion_pressure_plot(df, numeric_cols)
+    if pressure_plot is not None:
+        figures["Extrusion Pressure Over Time"] = pressure_plot
+    
     # Only add correlation heatmap if it can be created
-    heatmap = create_correlation_heatmap(df)
+    heatmap = create_correlation_heatmap(X, summary[1], numeric_cols)
     if heatmap is not None:
         figures["Correlation Heatmap"] = heatmap
     
@@ -215,7 +327,31 @@ def analyze_profile(input_file, output_dir):
 
 # Main execution code remains the same
 
-def main(output_dir):
+def analyze_profiles(input_files, output_dir):
+    # Profiles are independent, so each file is analyzed in its own process; a file that fails is reported and skipped
+    failed = []
+    with ProcessPoolExecutor(max_workers=min(len(input_files), os.cpu_count() or 1)) as executor:
+        futures = {executor.submit(analyze_profile, input_file, output_dir): input_file for input_file in input_files}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failed.append(futures[future])
+                print(f"Error analyzing '{futures[future]}': {e}")
+
+    print(f"Analyzed {len(input_files) - len(failed)} of {len(input_files)} files.")
+    for input_file in sorted(failed):
+        print(f"Failed: {input_file}")
+
+def main(output_dir, input_glob=None):
+    if input_glob:
+        input_files = sorted(f for f in glob.glob(input_glob) if f.endswith('.csv'))
+        if not input_files:
+            print(f"Error: No CSV files match '{input_glob}'.")
+            return
+        analyze_profiles(input_files, output_dir)
+        return
+
     while True:
         input_file = input("Please enter the full path of the CSV file you want to analyze (or 'q' to quit): ").strip()
         
@@ -241,6 +377,7 @@ def main(output_dir):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Analyze aluminum extrusion data")
     parser.add_argument("--output_dir", default="D:\\Csv analytics\\analysis_output", help="Path to output directory")
+    parser.add_argument("--input_glob", help="Glob of CSV files to analyze in parallel instead of prompting")
     args = parser.parse_args()
 
-    main(args.output_dir)
\ No newline at end of file
+    main(args.output_dir, args.input_glob)
\ No newline at end of file
@@ -1,70 +1,143 @@
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # figures are only rendered into the PDF, also from batch worker processes
 import matplotlib.pyplot as plt
-import seaborn as sns
-from reportlab.lib.pagesizes import landscape, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, PageBreak, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
 import os
 import io
-from scipy import stats
 import numpy as np
 import argparse
-import matplotlib.dates as mdates
+import glob
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from matplotlib.ticker import AutoMinorLocator
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
 def load_data(file_path):
-    df = pd.read_csv(file_path)
-    if 'Date' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'], format='%d/%m/%y %H:%M')
-        df.set_index('Date', inplace=True)
-    return df
+    has_date = 'Date' in pd.read_csv(file_path, nrows=0).columns
+    # Dates are parsed during the read with the logger's fixed format; pyarrow's
+    # multithreaded parser is used when it is installed, the C engine otherwise
+    for engine in ('pyarrow', 'c'):
+        try:
+            if not has_date:
+                return pd.read_csv(file_path, engine=engine)
+            df = pd.read_csv(file_path, parse_dates=['Date'], date_format='%d/%m/%y %H:%M', index_col='Date', engine=engine)
+        except ImportError:
+            continue
+        # read_csv leaves the dates as text when any of them misses the format; parsing
+        # them strictly here reports the offending value, as the original loader did
+        if not isinstance(df.index, pd.DatetimeIndex):
+            df.index = pd.to_datetime(df.index, format='%d/%m/%y %H:%M')
+        return df
 
 def generate_statistical_summary(df):
     numeric_cols = df.select_dtypes(include=[np.number]).columns
-    summary = df[numeric_cols].describe()
-    summary.loc['range'] = summary.loc['max'] - summary.loc['min']
-    return summary
+    X = df[numeric_cols].to_numpy(dtype=float)
+    # One quantile call gives min, quartiles and max; describe() would make a pass per statistic
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns simply yield NaN
+        q = np.nanquantile(X, [0, 0.25, 0.5, 0.75, 1], axis=0)
+        rows = np.vstack([np.count_nonzero(~np.isnan(X), axis=0), np.nanmean(X, axis=0),
+                          np.nanstd(X, axis=0, ddof=1), q, q[-1] - q[0]])
+    return pd.DataFrame(rows, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max', 'range'], columns=numeric_cols)
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _zscore_mask(arr, threshold, out):
+        # One column per thread: mean and population std, then the threshold test; constant or NaN columns are skipped
+        n, k = arr.shape
+        for j in prange(k):
+            col = arr[:, j]
+            m = col.mean()
+            s = col.std()
+            if not s > 0:
+                continue
+            for i in range(n):
+                out[i, j] = abs(col[i] - m) / s > threshold
 
 def detect_outliers(df, threshold=3):
-    outliers = {}
     numeric_cols = df.select_dtypes(include=[np.number]).columns
-    for column in numeric_cols:
-        z_scores = np.abs(stats.zscore(df[column]))
-        outliers[column] = df[column][z_scores > threshold]
-    return outliers
+    if njit is not None:
+        arr = np.asfortranarray(df[numeric_cols].to_numpy(dtype=np.float64))
+        mask = np.zeros(arr.shape, dtype=np.bool_)
+        _zscore_mask(arr, threshold, mask)
+    else:
+        arr = df[numeric_cols].to_numpy(dtype=np.float64)
+        # z-scores for every column in one broadcast, using the population std as scipy.stats.zscore did
+        mu = arr.mean(axis=0)
+        sd = arr.std(axis=0)
+        sd = np.where(sd > 0, sd, np.nan)  # constant columns have no outliers
+        with np.errstate(invalid='ignore'):
+            mask = np.abs(arr - mu) / sd > threshold
+    return {column: df[column][mask[:, i]] for i, column in enumerate(numeric_cols)}
+
+def _decimate(df, columns, n_out=2000):
+    # Min and max row of every column per bucket, so spikes survive at plot resolution
+    if len(df) <= n_out:
+        return df[columns]
+    Y = df[columns].to_numpy(dtype=float)
+    n = len(Y)
+    bucket = -(-n // (n_out // 2))
+    n_blocks = -(-n // bucket)
+    blocks = np.pad(Y, ((0, n_blocks * bucket - n), (0, 0)), constant_values=np.nan).reshape(n_blocks, bucket, -1)
+    offsets = (np.arange(n_blocks) * bucket)[:, None]
+    lo = np.argmin(np.where(np.isnan(blocks), np.inf, blocks), axis=1) + offsets
+    hi = np.argmax(np.where(np.isnan(blocks), -np.inf, blocks), axis=1) + offsets
+    idx = np.unique(np.concatenate([lo.ravel(), hi.ravel()]))
+    return df[columns].iloc[idx[idx < n]]
+
+def _time_axis(index, interval='2h'):
+    # Plot against epoch seconds and label the ticks once, bypassing matplotlib's per-tick date conversion
+    if not isinstance(index, pd.DatetimeIndex) or index.empty:
+        return np.asarray(index), None
+    x = index.to_numpy(dtype='datetime64[ns]').view('int64') / 1e9
+    ticks = pd.date_range(index.min().ceil(interval), index.max(), freq=interval)
+    return x, (ticks.to_numpy(dtype='datetime64[ns]').view('int64') / 1e9, ticks.strftime('%H:%M'))
+
+def figure_to_png(fig):
+    img_data = io.BytesIO()
+    fig.savefig(img_data, format='png', dpi=150, bbox_inches='tight', pil_kwargs={'compress_level': 1})
+    img_data.seek(0)
+    return img_data
 
 def plot_time_series(df, columns):
     available_columns = [col for col in columns if col in df.columns and np.issubdtype(df[col].dtype, np.number)]
     figures = []
+    if not available_columns:
+        return figures
     
+    # One figure is reused for every column and rendered straight away; the constrained layout replaces tight_layout
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 18), gridspec_kw={'height_ratios': [2, 1]}, layout='constrained')
     for col in available_columns:
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 18), gridspec_kw={'height_ratios': [2, 1]})
+        ax1.cla()
+        ax2.cla()
+        series = _decimate(df, [col])[col]
+        x, ticks = _time_axis(series.index)
         
         # Full range plot
-        df[col].plot(ax=ax1)
-        format_axis(ax1, col)
+        ax1.plot(x, series.to_numpy())
+        format_axis(ax1, col, ticks)
         
         # Focused plot (only for temperature-related columns)
+        ax2.set_visible('TEMP' in col)  # Hide the second subplot if it's not a temperature column
         if 'TEMP' in col:
-            df[col].plot(ax=ax2)
-            format_axis(ax2, col)
+            ax2.plot(x, series.to_numpy())
+            format_axis(ax2, col, ticks)
             ax2.set_ylim(450, 550)  # Set y-axis limits to focus on the range around 500°C
             ax2.set_title(f"{col} (Focused on 500°C Range)")
-        else:
-            fig.delaxes(ax2)  # Remove the second subplot if it's not a temperature column
             
-        plt.tight_layout()
-        figures.append((f"{col} Over Time", fig))
+        figures.append((f"{col} Over Time", figure_to_png(fig)))
     
+    plt.close(fig)
     return figures
 
-def format_axis(ax, col):
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-    ax.xaxis.set_major_locator(mdates.HourLocator(interval=2))
-    ax.xaxis.set_minor_locator(AutoMinorLocator())
-    plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+def format_axis(ax, col, ticks=None):
+    if ticks is not None:
+        ax.set_xticks(*ticks, rotation=45, ha='right')
+        ax.xaxis.set_minor_locator(AutoMinorLocator())
     
     if 'TEMP' in col:
         ax.axhline(y=500, color='orange', linestyle=':', linewidth=2)
@@ -74,15 +147,34 @@ def format_axis(ax, col):
     ax.set_xlabel('Time')
     ax.grid(True, which='both', linestyle='--', linewidth=0.5)
     
+def correlation_matrix(df):
+    # Pearson correlation as one float32 GEMM; NaNs are treated as the column mean
+    X = df.to_numpy(dtype=np.float32, copy=True)
+    X -= np.nanmean(X, axis=0)
+    np.nan_to_num(X, copy=False)
+    C = X.T @ X
+    d = np.sqrt(np.diag(C))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        C /= np.outer(d, d)
+    return pd.DataFrame(C, index=df.columns, columns=df.columns)
+
 def create_correlation_heatmap(df):
     numeric_df = df.select_dtypes(include=[np.number])
     
     if numeric_df.empty:
         return None
     
-    corr = numeric_df.corr()
+    corr = correlation_matrix(numeric_df)
+    C = corr.to_numpy()
     fig, ax = plt.subplots(figsize=(11.69, 8.27))  # A4 landscape size in inches
-    sns.heatmap(corr, annot=True, cmap='coolwarm', ax=ax, fmt='.2f')
+    im = ax.imshow(C, cmap='coolwarm', vmin=-1, vmax=1)
+    fig.colorbar(im, ax=ax)
+    ax.set_xticks(range(len(corr.columns)), corr.columns, rotation=45, ha='right')
+    ax.set_yticks(range(len(corr.index)), corr.index)
+    # Beyond ten columns the cell labels are unreadable, so they are skipped
+    if len(corr.columns) <= 10:
+        for i, j in np.ndindex(C.shape):
+            ax.text(j, i, f"{C[i, j]:.2f}", ha='center', va='center')
     ax.set_title("Correlation Heatmap")
     plt.tight_layout()
     return fig
@@ -124,7 +216,21 @@ def create_extrusion_pressure_plot(df):
     plt.tight_layout()
     return fig
 
+def format_values(values):
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isnan(values), "N/A", np.char.mod("%.2f", values))
+
+def format_timestamps(index):
+    text = index.strftime('%Y-%m-%d %H:%M:%S') if isinstance(index, pd.DatetimeIndex) else index.astype(str)
+    return np.where(index.isna(), "N/A", text)
+
 def generate_pdf_report(output_file, df, stats, figures, outliers):
+    # ReportLab is only needed once a report is written, so bad input fails before paying for the import
+    from reportlab.lib.pagesizes import landscape, A4
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, PageBreak, Image
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib import colors
+
     doc = SimpleDocTemplate(output_file, pagesize=landscape(A4))
     story = []
     styles = getSampleStyleSheet()
@@ -151,7 +257,7 @@ def generate_pdf_report(output_file, df, stats, figures, outliers):
 
     for half in [first_half, second_half]:
         data = [['Statistic'] + half]
-        data.extend(stats[half].reset_index().values.tolist())
+        data.extend(np.column_stack([stats.index.astype(str), format_values(stats[half].to_numpy())]).tolist())
         t = Table(data)
         t.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
@@ -169,27 +275,11 @@ def generate_pdf_report(output_file, df, stats, figures, outliers):
     story.append(PageBreak())
 
     # Figures
-    for title, fig in figures:
+    for title, img_data in figures:
         story.append(Paragraph(title, styles['Heading2']))
-        img_data = io.BytesIO()
-        fig.savefig(img_data, format='png', dpi=300, bbox_inches='tight')
-        img_data.seek(0)
-        img = Image(img_data)
-        
-        # Calculate the available space on the page
-        available_width = doc.width * 0.9  # 90% of the page width
-        available_height = doc.height * 0.7  # 70% of the page height
         
-        # Adjust the image size to fit within the available space
-        img.drawWidth = available_width
-        img.drawHeight = available_height
-        aspect = img.imageWidth / float(img.imageHeight)
-        if img.drawWidth / float(img.drawHeight) > aspect:
-            img.drawWidth = img.drawHeight * aspect
-        else:
-            img.drawHeight = img.drawWidth / aspect
-        
-        story.append(img)
+        # Fit the image within 90% of the page width and 70% of its height, keeping its aspect ratio
+        story.append(Image(img_data, width=doc.width * 0.9, height=doc.height * 0.7, kind='proportional'))
         story.append(PageBreak())
 
     # Outlier Analysis
@@ -198,7 +288,7 @@ def generate_pdf_report(output_file, df, stats, figures, outliers):
         if not values.empty:
             story.append(Paragraph(f"Outliers in {col}:", styles['Heading3']))
             data = [['Timestamp', f'{col} ({get_units(col)})']]
-            data.extend(values.reset_index().values.tolist())
+            data.extend(np.column_stack([format_timestamps(values.index), format_values(values.to_numpy())]).tolist())
             t = Table(data)
             t.setStyle(TableStyle([
                 ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
@@ -241,9 +331,12 @@ def analyze_profile(input_file, output_dir):
     
     time_series_figures = plot_time_series(df, df.select_dtypes(include=[np.number]).columns)
     
+    # The time series arrive already rendered; the remaining figures are rendered here
     figures = time_series_figures + [
-        ("Extrusion Pressure Over Time", create_extrusion_pressure_plot(df)),
-        ("Correlation Heatmap", create_correlation_heatmap(df))
+        (title, figure_to_png(fig)) for title, fig in [
+            ("Extrusion Pressure Over Time", create_extrusion_pressure_plot(df)),
+            ("Correlation Heatmap", create_correlation_heatmap(df))
+        ] if fig is not None
     ]
     
     output_file = os.path.join(profile_dir, f"{profile}_analysis.pdf")
@@ -277,9 +370,30 @@ def main(output_dir):
 
     print("Analysis complete. Goodbye!")
 
+def batch_main(batch_dir, output_dir):
+    # Every file is analyzed independently, so each one goes to its own worker process
+    files = sorted(glob.glob(os.path.join(batch_dir, '*.csv')))
+    if not files:
+        print(f"No CSV files found in '{batch_dir}'.")
+        return
+
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {executor.submit(analyze_profile, input_file, output_dir): input_file for input_file in files}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error analyzing '{futures[future]}': {e}")
+
+    print(f"Batch analysis of {len(files)} files complete.")
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Analyze aluminum extrusion data")
     parser.add_argument("--output_dir", default="D:\\Csv analytics\\analysis_output", help="Path to output directory")
+    parser.add_argument("--batch_dir", help="Analyze every CSV file in this directory in parallel instead of prompting")
     args = parser.parse_args()
 
-    main(args.output_dir)
\ No newline at end of file
+    if args.batch_dir:
+        batch_main(args.batch_dir, args.output_dir)
+    else:
+        main(args.output_dir)
\ No newline at end of file
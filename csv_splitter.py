@@ -3,7 +3,7 @@ import os
 
 def split_csv_by_profile(input_file, output_base_dir):
     # Columns to exclude
-    exclude_columns = ['DATE_ID', 'DECELERATION_PRESSURE', 'DEAD_CYCLE_TIME', 'PILOT_PRESSURE', 'CONTAINER_SEAL_PRESSURE', 'MAIN_PUMP_2', 'MAIN_PUMP_3']
+    exclude_columns = {'DATE_ID', 'DECELERATION_PRESSURE', 'DEAD_CYCLE_TIME', 'PILOT_PRESSURE', 'CONTAINER_SEAL_PRESSURE', 'MAIN_PUMP_2', 'MAIN_PUMP_3'}
 
     # Dictionary to store file handlers for each profile
     profile_files = {}
@@ -11,13 +11,21 @@ def split_csv_by_profile(input_file, output_base_dir):
 
     # Read the input CSV file
     with open(input_file, 'r', newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
+        reader = csv.reader(csvfile)
+        header = next(reader)
         
-        # Filter out the excluded columns
-        fieldnames = [field for field in reader.fieldnames if field not in exclude_columns]
+        # Positions of the kept columns, worked out once from the header
+        keep_idx = [i for i, field in enumerate(header) if field not in exclude_columns]
+        fieldnames = [header[i] for i in keep_idx]
+        profile_idx = header.index('PROFILE')
 
         for row in reader:
-            profile = row['PROFILE']
+            if not row:
+                continue  # blank line; DictReader skipped these too
+            if len(row) < len(header):
+                # Short rows get empty trailing fields, as DictReader filled them in
+                row += [''] * (len(header) - len(row))
+            profile = row[profile_idx]
             
             # Create a new directory and file for the profile if it doesn't exist
             if profile not in profile_files:
@@ -27,12 +35,11 @@ def split_csv_by_profile(input_file, output_base_dir):
                 output_file = os.path.join(profile_dir, f"{profile}.csv")
                 profile_files[profile] = open(output_file, 'w', newline='', encoding='utf-8')
                 
-                profile_writers[profile] = csv.DictWriter(profile_files[profile], fieldnames=fieldnames)
-                profile_writers[profile].writeheader()
+                profile_writers[profile] = csv.writer(profile_files[profile])
+                profile_writers[profile].writerow(fieldnames)
             
             # Write the row to the corresponding profile's CSV file, excluding specified columns
-            filtered_row = {k: v for k, v in row.items() if k in fieldnames}
-            profile_writers[profile].writerow(filtered_row)
+            profile_writers[profile].writerow([row[i] for i in keep_idx])
 
     # Close all open file handlers
     for file in profile_files.values():
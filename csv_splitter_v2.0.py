@@ -1,75 +1,96 @@
-import csv
 import os
-from collections import defaultdict
+import re
+import shutil
 import datetime
+import pandas as pd
+
+# Rows parsed per chunk, so memory use is bounded by the chunk rather than the input size
+CHUNK_SIZE = 200_000
+
+# Anything other than letters, digits, '-' and '_' is replaced in file names
+_SAFE_CHAR = re.compile(r'[\w-]')
+
+class _FilenameChars(dict):
+    # str.translate table filled in on first sight of each character:
+    # '/' becomes '-', letters, digits, '-' and '_' are kept, anything else becomes '_'
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        self[codepoint] = '-' if char == '/' else char if _SAFE_CHAR.fullmatch(char) else '_'
+        return self[codepoint]
+
+_FILENAME_CHARS = _FilenameChars()
 
 def get_current_date():
     return datetime.datetime.now().strftime("%Y-%m-%d")
 
 def sanitize_filename(filename):
     # Replace slashes with hyphens and remove any other invalid characters
-    return ''.join(c if c.isalnum() or c in ('-', '_') else '_' for c in filename.replace('/', '-'))
+    return filename.translate(_FILENAME_CHARS)
+
+def link_or_copy(src, dst):
+    # Hard-link the second copy of a split file, copying only where links are not supported
+    if os.path.lexists(dst):
+        os.remove(dst)  # a stale file, or a link to the file just rewritten
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
 
 def split_csv_by_profile_and_date(input_file, output_base_dir):
     # Columns to exclude
     exclude_columns = ['DATE_ID', 'DEAD_CYCLE_TIME']
 
-    # Dictionary to store data for each profile and date
-    profile_date_data = defaultdict(lambda: defaultdict(list))
+    # Stream the input CSV as text in chunks, skipping the excluded columns while parsing
+    reader = pd.read_csv(input_file, usecols=lambda col: col not in exclude_columns, dtype=str, keep_default_na=False,
+                         encoding='utf-8', chunksize=CHUNK_SIZE)
 
-    # Read the input CSV file
-    with open(input_file, 'r', newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        
-        # Filter out the excluded columns
-        fieldnames = [field for field in reader.fieldnames if field not in exclude_columns]
+    # Output paths for each profile and date, and record counts per profile, then per date
+    split_files = {}
+    group_sizes = {}
 
-        for row in reader:
-            profile = row['PROFILE']
-            date_str = row['Date'].split()[0]  # Extract date part from Date column
-            
-            # Store the row data
-            filtered_row = {k: v for k, v in row.items() if k in fieldnames}
-            profile_date_data[profile][date_str].append(filtered_row)
-
-    # Write data to separate CSV files
-    for profile, date_data in profile_date_data.items():
-        for date_str, rows in date_data.items():
-            sanitized_profile = sanitize_filename(profile)
-            sanitized_date = sanitize_filename(date_str)
-            
-            profile_dir = os.path.join(output_base_dir, 'by_profile', sanitized_profile)
-            date_dir = os.path.join(output_base_dir, 'by_date', sanitized_date)
-            
-            os.makedirs(profile_dir, exist_ok=True)
-            os.makedirs(date_dir, exist_ok=True)
-            
-            profile_file = os.path.join(profile_dir, f"{sanitized_profile}_{sanitized_date}.csv")
-            date_file = os.path.join(date_dir, f"{sanitized_profile}_{sanitized_date}.csv")
-            
-            # Write to profile-specific file
-            with open(profile_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(rows)
+    for chunk in reader:
+        chunk['__date'] = chunk['Date'].str.split(n=1).str[0]  # Extract date part from Date column
+
+        for key, group in chunk.groupby(['PROFILE', '__date'], sort=False):
+            rows = group.drop(columns='__date')
+            profile, date_str = key
+            date_sizes = group_sizes.setdefault(profile, {})
+            date_sizes[date_str] = date_sizes.get(date_str, 0) + len(rows)
             
-            # Write to date-specific file
-            with open(date_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(rows)
+            # Create the file the first time a profile and date appears, append to it afterwards
+            if key not in split_files:
+                sanitized_profile = sanitize_filename(profile)
+                sanitized_date = sanitize_filename(date_str)
+                
+                profile_dir = os.path.join(output_base_dir, 'by_profile', sanitized_profile)
+                date_dir = os.path.join(output_base_dir, 'by_date', sanitized_date)
+                
+                os.makedirs(profile_dir, exist_ok=True)
+                os.makedirs(date_dir, exist_ok=True)
+                
+                profile_file = os.path.join(profile_dir, f"{sanitized_profile}_{sanitized_date}.csv")
+                date_file = os.path.join(date_dir, f"{sanitized_profile}_{sanitized_date}.csv")
+                split_files[key] = (profile_file, date_file)
+                
+                # Write to profile-specific file
+                rows.to_csv(profile_file, index=False, encoding='utf-8', lineterminator='\r\n')
+            else:
+                rows.to_csv(split_files[key][0], mode='a', header=False, index=False, encoding='utf-8', lineterminator='\r\n')
+
+    # The date-specific files hold the same rows, so they are linked rather than written again
+    for profile_file, date_file in split_files.values():
+        link_or_copy(profile_file, date_file)
 
-    print(f"Split CSV files based on {len(profile_date_data)} profiles and their respective dates.")
+    print(f"Split CSV files based on {len(group_sizes)} profiles and their respective dates.")
 
     # Generate key notes
-    generate_key_notes(profile_date_data, output_base_dir)
+    generate_key_notes(group_sizes, output_base_dir)
 
-def generate_key_notes(profile_date_data, output_base_dir):
+def generate_key_notes(group_sizes, output_base_dir):
     key_notes = []
 
-    for profile, date_data in profile_date_data.items():
-        for date_str, rows in date_data.items():
-            num_records = len(rows)
+    for profile, date_sizes in group_sizes.items():
+        for date_str, num_records in date_sizes.items():
             key_notes.append(f"Profile: {profile}, Date: {date_str}, Number of records: {num_records}")
 
     # Get current date for the filename
@@ -1,79 +1,118 @@
-import csv
 import os
-from collections import defaultdict
+import re
+import json
+import shutil
+import hashlib
 import datetime
-from datetime import timedelta
 import pandas as pd 
 
+_SAFE_CHAR = re.compile(r'[\w-]')
+
+class _FilenameChars(dict):
+    # str.translate table filled in on first sight of each character:
+    # '/' becomes '-', letters, digits, '-' and '_' are kept, anything else becomes '_'
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        self[codepoint] = '-' if char == '/' else char if _SAFE_CHAR.fullmatch(char) else '_'
+        return self[codepoint]
+
+_FILENAME_CHARS = _FilenameChars()
+
+# Content hashes of the files written by the last split, so unchanged groups are not rewritten
+MANIFEST_NAME = 'split_manifest.json'
+
 def get_current_date():
     return datetime.datetime.now().strftime("%Y-%m-%d")
 
 def sanitize_filename(filename):
-    return ''.join(c if c.isalnum() or c in ('-', '_') else '_' for c in filename.replace('/', '-'))
+    return filename.translate(_FILENAME_CHARS)
+
+def link_or_copy(src, dst):
+    if os.path.lexists(dst):
+        os.remove(dst)  # a stale file, or a link to the file just rewritten
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+def load_manifest(output_base_dir):
+    try:
+        with open(os.path.join(output_base_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest, output_base_dir):
+    with open(os.path.join(output_base_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
 
 def split_csv_by_profile_and_date(input_file, output_base_dir):
     exclude_columns = ['DATE_ID', 'DEAD_CYCLE_TIME']
-    profile_date_data = defaultdict(lambda: defaultdict(list))
+    df = pd.read_csv(input_file, usecols=lambda col: col not in exclude_columns, dtype=str, keep_default_na=False, encoding='utf-8')
+    df['__date'] = df['Date'].str.split(n=1).str[0]
 
-    with open(input_file, 'r', newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        fieldnames = [field for field in reader.fieldnames if field not in exclude_columns]
+    group_sizes = {}
+    manifest = load_manifest(output_base_dir)
+    skipped = 0
+    for profile, profile_rows in df.groupby('PROFILE', sort=False):
+        # Everything that depends only on the profile is done once per profile
+        sanitized_profile = sanitize_filename(profile)
+        profile_dir = os.path.join(output_base_dir, 'by_profile', sanitized_profile)
+        os.makedirs(profile_dir, exist_ok=True)
 
-        for row in reader:
-            profile = row['PROFILE']
-            date_str = row['Date'].split()[0]
-            filtered_row = {k: v for k, v in row.items() if k in fieldnames}
-            profile_date_data[profile][date_str].append(filtered_row)
-
-    for profile, date_data in profile_date_data.items():
-        for date_str, rows in date_data.items():
-            sanitized_profile = sanitize_filename(profile)
+        for date_str, group in profile_rows.groupby('__date', sort=False):
             sanitized_date = sanitize_filename(date_str)
-            
-            profile_dir = os.path.join(output_base_dir, 'by_profile', sanitized_profile)
             date_dir = os.path.join(output_base_dir, 'by_date', sanitized_date)
-            
-            os.makedirs(profile_dir, exist_ok=True)
             os.makedirs(date_dir, exist_ok=True)
             
             profile_file = os.path.join(profile_dir, f"{sanitized_profile}_{sanitized_date}.csv")
             date_file = os.path.join(date_dir, f"{sanitized_profile}_{sanitized_date}.csv")
             
-            for file_path in [profile_file, date_file]:
-                with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.DictWriter(f, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(rows)
+            rows = group.drop(columns='__date')
+            group_sizes[(profile, date_str)] = len(rows)
+            content = rows.to_csv(index=False, lineterminator='\r\n')
+            digest = hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+            key = os.path.relpath(profile_file, output_base_dir)
+            if manifest.get(key) == digest and os.path.exists(profile_file) and os.path.exists(date_file):
+                skipped += 1
+                continue
+
+            with open(profile_file, 'w', encoding='utf-8', newline='') as f:
+                f.write(content)
+            link_or_copy(profile_file, date_file)
+            manifest[key] = digest
 
-    print(f"Split CSV files based on {len(profile_date_data)} profiles and their respective dates.")
-    generate_key_notes(profile_date_data, output_base_dir)
+    save_manifest(manifest, output_base_dir)
+    print(f"Split CSV files based on {df['PROFILE'].nunique()} profiles and their respective dates.")
+    if skipped:
+        print(f"{skipped} of {len(group_sizes)} files were unchanged and left as they were.")
+    generate_key_notes(group_sizes, output_base_dir)
 
 def split_csv_by_day(input_file, output_base_dir):
-    df = pd.read_csv(input_file, parse_dates=['Date'])
+    # pyarrow's multithreaded parser when it is installed, the C engine otherwise
+    try:
+        df = pd.read_csv(input_file, parse_dates=['Date'], engine='pyarrow')
+    except ImportError:
+        df = pd.read_csv(input_file, parse_dates=['Date'])
     df.set_index('Date', inplace=True)
     
-    def get_day_group(date):
-        if date.hour < 7:
-            return (date - timedelta(days=1)).strftime('%Y-%m-%d')
-        return date.strftime('%Y-%m-%d')
-    
-    df['day_group'] = df.index.map(get_day_group)
+    # Readings before 7AM belong to the previous day's 7AM-7AM window; the key stays
+    # datetime64 (8 bytes a row) rather than a Python string per row
+    df['day_group'] = (df.index - pd.Timedelta(hours=7)).floor('D')
     
-    for day, group in df.groupby('day_group'):
-        start_date = datetime.datetime.strptime(day, '%Y-%m-%d') + timedelta(hours=7)
-        end_date = start_date + timedelta(days=1)
+    for day, group in df.groupby('day_group', sort=False):
+        start_date = day + pd.Timedelta(hours=7)
+        end_date = start_date + pd.Timedelta(days=1)
         filename = f"{start_date.strftime('%Y-%m-%d')}_to_{end_date.strftime('%Y-%m-%d')}.csv"
         output_path = os.path.join(output_base_dir, 'by_day', filename)
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         group.to_csv(output_path)
         print(f"Saved file: {output_path}")
 
-def generate_key_notes(profile_date_data, output_base_dir):
+def generate_key_notes(group_sizes, output_base_dir):
     key_notes = []
-    for profile, date_data in profile_date_data.items():
-        for date_str, rows in date_data.items():
-            num_records = len(rows)
-            key_notes.append(f"Profile: {profile}, Date: {date_str}, Number of records: {num_records}")
+    for (profile, date_str), num_records in group_sizes.items():
+        key_notes.append(f"Profile: {profile}, Date: {date_str}, Number of records: {num_records}")
 
     current_date = get_current_date()
     key_notes_file = os.path.join(output_base_dir, f'key_notes_{current_date}.txt')
@@ -1,75 +1,169 @@
 import os
+import re
+import glob
 import pandas as pd
-from datetime import datetime, timedelta
 
-def sanitize_filename(filename):
-    """Sanitize filenames to ensure compatibility with all operating systems."""
-    return ''.join(c if c.isalnum() or c in ('-', '_', '.') else '_' for c in filename)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.dataset as pads
+except ImportError:
+    pa = None
 
-def calculate_shifted_date(timestamp):
-    """
-    Adjust timestamp for a 7AM-7AM operational day.
-    If the timestamp is before 7AM, associate it with the previous day.
-    """
-    if pd.isnull(timestamp):
-        return None  # Handle invalid timestamps
-    if timestamp.hour < 7:
-        return (timestamp - timedelta(days=1)).strftime('%d/%m/%Y')  # Use DD/MM/YYYY format
-    return timestamp.strftime('%d/%m/%Y')
+# Rows read per chunk; bounds memory use regardless of the log's length
+CHUNK_SIZE = 1_000_000
+
+# Bytes handed to each of pyarrow's parser threads at a time
+BLOCK_SIZE = 8 << 20
 
-def split_csv_by_7am_days(input_file, output_base_dir):
+# Anything other than letters, digits, '-', '_' and '.' is replaced in file names
+_SAFE_CHAR = re.compile(r'[\w.-]')
+
+class _FilenameChars(dict):
+    # str.translate table filled in on first sight of each character
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        self[codepoint] = char if _SAFE_CHAR.fullmatch(char) else '_'
+        return self[codepoint]
+
+_FILENAME_CHARS = _FilenameChars()
+
+def sanitize_filename(filename):
+    """Sanitize filenames to ensure compatibility with all operating systems."""
+    return filename.translate(_FILENAME_CHARS)
+
+def read_csv_chunks(input_file):
+    """Yield the CSV as DataFrames of bounded size, parsed by pyarrow's threaded streaming reader when it is installed."""
+    rows_read = 0
+    if pa is not None:
+        # Timestamps are kept as text here and parsed with the logger's format below
+        reader = pacsv.open_csv(input_file,
+                                read_options=pacsv.ReadOptions(use_threads=True, block_size=BLOCK_SIZE),
+                                convert_options=pacsv.ConvertOptions(column_types={'Timestamp': pa.string()}))
+        try:
+            for batch in reader:
+                rows_read += batch.num_rows
+                yield batch.to_pandas()
+            return
+        except pa.ArrowInvalid:
+            # Column types are inferred from the first block; if a later block
+            # doesn't fit them, the rest of the file is read by pandas instead
+            pass
+    # round_trip keeps every float exactly as logged, as pyarrow's reader does
+    yield from pd.read_csv(input_file, skiprows=range(1, rows_read + 1), chunksize=CHUNK_SIZE, float_precision='round_trip')
+
+def sort_day_file(output_path):
+    """Rewrite a day file in Timestamp order, keeping every cell's text exactly as written."""
+    day = pd.read_csv(output_path, dtype=str, keep_default_na=False)
+    order = pd.to_datetime(day['Timestamp'], format='ISO8601').argsort(kind='stable')
+    day.iloc[order].to_csv(output_path, index=False)
+
+def write_parquet_days(chunk, dataset_dir, basename):
+    """Append a chunk to a Parquet dataset partitioned by operational day; returns the days it touched."""
+    table = pa.Table.from_pandas(chunk, columns=[c for c in chunk.columns if c != 'ShiftedDate'], preserve_index=False)
+    days = pa.array(chunk['ShiftedDate']).cast(pa.date32())
+    table = table.append_column('OperationalDay', days)
+    # One file per chunk and day, named after the input log so logs sharing a day sit side by side
+    pads.write_dataset(table, dataset_dir, format='parquet',
+                       partitioning=pads.partitioning(pa.schema([('OperationalDay', pa.date32())]), flavor='hive'),
+                       basename_template=f"{basename}-{{i}}.parquet", existing_data_behavior='overwrite_or_ignore')
+    return set(days.unique().to_pylist())
+
+def split_csv_by_7am_days(input_file, output_base_dir, output_format='csv'):
     """
     Split the CSV data into daily chunks based on the 7AM-7AM operational day logic.
+    The file is streamed in chunks, so memory use does not grow with the size of the log.
+    With output_format='parquet' the days are written as one Parquet dataset partitioned
+    by operational day instead of one CSV per day.
     """
+    if output_format == 'parquet' and pa is None:
+        print("Error: Parquet output requires pyarrow.")
+        return
+
     skipped_rows = []  # To store rows with invalid timestamps
+    day_files = {}  # Operational day -> (output path, open file), kept open across chunks
+    day_last = {}  # Operational day -> latest Timestamp written to its file so far
+    unsorted_days = set()  # Days that received rows older than ones an earlier chunk wrote
+    parquet_days = set()
+    dataset_dir = os.path.join(output_base_dir, 'PUA_parquet')
+    log_name = sanitize_filename(os.path.splitext(os.path.basename(input_file))[0])
+    if output_format == 'parquet':
+        # Parts left by an earlier run of this log are removed, so a shorter re-run leaves none behind
+        for old_part in glob.glob(os.path.join(glob.escape(dataset_dir), '*', f"{glob.escape(log_name)}-part-*.parquet")):
+            os.remove(old_part)
     try:
-        # Load the CSV
-        df = pd.read_csv(input_file)
-
-        # Convert 'Timestamp' to datetime
-        if 'Timestamp' in df.columns:
-            df['Timestamp'] = pd.to_datetime(df['Timestamp'], format='%d/%m/%Y %H:%M', errors='coerce')
-        else:
-            raise ValueError("Timestamp column not found in the dataset.")
-        
-        # Adjust the date for 7AM-7AM operational logic
-        df['ShiftedDate'] = df['Timestamp'].apply(calculate_shifted_date)
+        for part, chunk in enumerate(read_csv_chunks(input_file)):
+            # Convert 'Timestamp' to datetime
+            if 'Timestamp' not in chunk.columns:
+                raise ValueError("Timestamp column not found in the dataset.")
+            chunk['Timestamp'] = pd.to_datetime(chunk['Timestamp'], format='%d/%m/%Y %H:%M', errors='coerce')
+
+            # Adjust the date for 7AM-7AM operational logic: shifting back 7 hours puts
+            # readings before 7AM on the previous day; invalid timestamps stay NaT.
+            # Kept as datetimes so grouping is fast; only each day's key is formatted
+            chunk['ShiftedDate'] = (chunk['Timestamp'] - pd.Timedelta(hours=7)).dt.floor('D')
+
+            # Separate invalid rows
+            invalid = chunk['ShiftedDate'].isnull()
+            if invalid.any():
+                skipped_rows.append(chunk[invalid])
+                chunk = chunk[~invalid]
+
+            if output_format == 'parquet':
+                # Ensure Timestamp is sorted; logger exports usually already are
+                if not chunk['Timestamp'].is_monotonic_increasing:
+                    chunk = chunk.sort_values('Timestamp')
+                parquet_days |= write_parquet_days(chunk, dataset_dir, f"{log_name}-part-{part}")
+                continue
+
+            # Append each day's rows to its file, creating the folder and header on first sight
+            out_cols = [c for c in chunk.columns if c != 'ShiftedDate']  # written without a per-day drop() copy
+            # groupby keeps each day's rows in file order, so only a day whose rows are out of
+            # order is sorted; the rest of the chunk is never copied into sorted order
+            for shifted_date, group in chunk.groupby('ShiftedDate', sort=False):
+                if not group['Timestamp'].is_monotonic_increasing:
+                    group = group.sort_values('Timestamp')
+                if shifted_date not in day_files:
+                    # Generate daily folder and file names
+                    day = shifted_date.strftime('%d-%m-%Y')  # Use DD-MM-YYYY in folder and file names
+                    folder_name = os.path.join(output_base_dir, f"{day}_Office")
+                    os.makedirs(folder_name, exist_ok=True)
+                    filename = f"PUA_{day}_Office.csv"
+                    output_path = os.path.join(folder_name, sanitize_filename(filename))
+                    day_files[shifted_date] = (output_path, open(output_path, 'wb'))
+                    header = True
+                else:
+                    header = False
+                    if group['Timestamp'].iloc[0] < day_last[shifted_date]:
+                        unsorted_days.add(shifted_date)
+                latest = group['Timestamp'].iloc[-1]
+                day_last[shifted_date] = max(day_last.get(shifted_date, latest), latest)
+                group.to_csv(day_files[shifted_date][1], index=False, header=header, columns=out_cols)
 
     except Exception as e:
         print(f"Error reading or parsing the file: {e}")
         return
 
-    # Separate invalid rows
-    invalid_rows = df[df['ShiftedDate'].isnull()]
-    if not invalid_rows.empty:
-        skipped_rows.extend(invalid_rows.to_dict('records'))
-        df = df.dropna(subset=['ShiftedDate'])
-
-    # Ensure Timestamp is sorted
-    df = df.sort_values('Timestamp')
+    finally:
+        for output_path, f in day_files.values():
+            f.close()
 
-    # Group by ShiftedDate
-    grouped = df.groupby('ShiftedDate')
+    # Chunks are only sorted within themselves; a day whose rows straddle chunks out of order is sorted once here
+    for shifted_date in unsorted_days:
+        sort_day_file(day_files[shifted_date][0])
 
-    # Create output folders and save each day's data
-    for shifted_date, group in grouped:
-        # Generate daily folder and file names
-        folder_name = os.path.join(output_base_dir, f"{shifted_date.replace('/', '-')}_Office")
-        os.makedirs(folder_name, exist_ok=True)
-        filename = f"PUA_{shifted_date.replace('/', '-')}_Office.csv"  # Use DD-MM-YYYY in filenames
-        output_path = os.path.join(folder_name, sanitize_filename(filename))
-
-        # Save the daily data to CSV
-        group.drop(columns=['ShiftedDate']).to_csv(output_path, index=False)
-        print(f"Saved file: {output_path}")
+    for shifted_date in sorted(day_files):
+        print(f"Saved file: {day_files[shifted_date][0]}")
+    if parquet_days:
+        print(f"Saved Parquet dataset: {dataset_dir}")
 
     # Save skipped rows (if any)
     if skipped_rows:
         skipped_file = os.path.join(output_base_dir, 'skipped_rows.csv')
-        pd.DataFrame(skipped_rows).to_csv(skipped_file, index=False)
+        pd.concat(skipped_rows).to_csv(skipped_file, index=False)
         print(f"Skipped rows saved to: {skipped_file}")
 
-    print(f"Processing complete. Total days processed: {len(grouped)}")
+    print(f"Processing complete. Total days processed: {len(day_files) + len(parquet_days)}")
 
 def main():
     """
@@ -79,6 +173,11 @@ def main():
     if not output_base_dir:
         output_base_dir = r"D:\PUA_analysis"  # Default output directory
 
+    output_format = input("Enter the output format, csv or parquet (default: csv): ").strip().lower() or 'csv'
+    if output_format not in ('csv', 'parquet'):
+        print(f"Unknown output format '{output_format}', using csv.")
+        output_format = 'csv'
+
     while True:
         input_file = input("Enter the full path of the CSV file to split (or 'q' to quit): ").strip()
         if input_file.lower() == 'q':
@@ -90,7 +189,7 @@ def main():
         
         try:
             # Split the file by operational day
-            split_csv_by_7am_days(input_file, output_base_dir)
+            split_csv_by_7am_days(input_file, output_base_dir, output_format)
         except Exception as e:
             print(f"An error occurred: {e}")
         
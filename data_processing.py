@@ -1,14 +1,106 @@
 import pandas as pd
 import numpy as np
 import os
+import tempfile
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Known PUA logger columns; float32 holds their sensor precision at half the memory of float64
+PUA_DTYPES = {
+    'MAIN_RAM_PRESSURE': 'float32',
+    'BREAKTHOUGH_PRESSURE': 'float32',
+    'CONTAINER_SEAL_PRESSURE': 'float32',
+    'DECELERATION_PRESSURE': 'float32',
+    'PILOT_PRESSURE': 'float32',
+    'MAIN_PUMP_1': 'float32',
+    'MAIN_PUMP_2': 'float32',
+    'MAIN_PUMP_3': 'float32',
+    'BILLET_TEMP': 'float32',
+    'CONTAINER_TEMP': 'float32',
+    'DIE_TEMP': 'float32',
+    'PROFILE_EXIT_TEMP': 'float32',
+}
+
+# Preprocessed numeric blocks larger than this are kept in a memory-mapped temporary file
+SPILL_BYTES = 512 * 2**20
+
+# Timestamp layouts written by the loggers and splitters, tried in order
+DATE_FORMATS = ['%Y-%m-%d %H:%M:%S', '%d/%m/%y %H:%M', '%d/%m/%Y %H:%M']
+
+def parse_dates(series):
+    # Probe the first reading for a known layout so the whole column takes pandas' fixed-format path
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    first = series.dropna().iloc[0] if series.notna().any() else None
+    for date_format in DATE_FORMATS:
+        try:
+            pd.to_datetime(first, format=date_format)
+        except (ValueError, TypeError):
+            continue
+        return pd.to_datetime(series, format=date_format, errors='coerce', cache=True)
+    return pd.to_datetime(series, errors='coerce')
 
 def load_data(file_path):
-    df = pd.read_csv(file_path)
+    # Columns missing from a file are simply ignored by the dtype map
+    try:
+        try:
+            df = pd.read_csv(file_path, dtype=PUA_DTYPES, engine='pyarrow')
+        except ImportError:
+            df = pd.read_csv(file_path, dtype=PUA_DTYPES)
+    except ValueError:
+        # A non-numeric cell such as 'ERR' in a sensor column; read untyped and blank it out
+        df = pd.read_csv(file_path)
+        for col in df.columns:
+            if col in PUA_DTYPES:
+                df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
     if 'Date' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+        df['Date'] = parse_dates(df['Date'])
         df.set_index('Date', inplace=True)
     return df
 
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _interpolate_and_smooth(arr, out):
+        # Linear interpolation over NaN gaps, then a centred 5-row mean, in one pass per column
+        n, m = arr.shape
+        for j in prange(m):
+            filled = np.full(n, np.nan)
+            last = -1
+            for i in range(n):
+                v = arr[i, j]
+                if np.isnan(v):
+                    continue
+                if last >= 0 and i - last > 1:
+                    step = (v - arr[last, j]) / (i - last)
+                    for k in range(last + 1, i):
+                        filled[k] = arr[last, j] + step * (k - last)
+                filled[i] = v
+                last = i
+            # Like interpolate(), trailing gaps repeat the last reading and leading gaps stay NaN
+            if last >= 0:
+                for k in range(last + 1, n):
+                    filled[k] = arr[last, j]
+
+            for i in range(n):
+                total = 0.0
+                count = 0
+                for k in range(max(i - 2, 0), min(i + 3, n)):
+                    if not np.isnan(filled[k]):
+                        total += filled[k]
+                        count += 1
+                out[i, j] = total / count if count else np.nan
+
+def _output_buffer(shape):
+    # Small blocks stay in RAM; large ones are paged from an anonymous temporary file
+    # that disappears once the last view of the mapping is gone
+    if np.prod(shape) * np.dtype(np.float32).itemsize <= SPILL_BYTES:
+        return np.empty(shape, dtype=np.float32, order='F')
+    with tempfile.TemporaryFile() as f:
+        return np.memmap(f, dtype=np.float32, mode='w+', shape=shape, order='F')
+
 def preprocess_data(df):
     # Convert object columns to numeric where possible
     for col in df.select_dtypes(include=['object']):
@@ -19,12 +111,21 @@ def preprocess_data(df):
     
     # Handle missing values
     df = df.infer_objects(copy=False)  # Infer better dtypes before interpolation
-    numeric_df = df.select_dtypes(include=[np.number])
-    df[numeric_df.columns] = numeric_df.interpolate()
+    numeric_columns = df.select_dtypes(include=[np.number]).columns
+    # Sensor readings carry far fewer digits than float32 holds, so the block is kept at half width
+    if njit is not None:
+        # Fill gaps and smooth in a single compiled pass over the numeric block
+        arr = np.asfortranarray(df[numeric_columns].to_numpy(dtype=np.float32))
+        out = _output_buffer(arr.shape)
+        _interpolate_and_smooth(arr, out)
+        # Build the result around the buffer without copying it, so a spilled block stays on disk
+        numeric = pd.DataFrame(out, index=df.index, columns=numeric_columns, copy=False)
+        return pd.concat([df.drop(columns=numeric_columns), numeric], axis=1)[df.columns]
+
+    df[numeric_columns] = df[numeric_columns].astype(np.float32).interpolate()
     
     # Smooth noisy data using rolling mean
-    numeric_columns = df.select_dtypes(include=[np.number]).columns
-    df[numeric_columns] = df[numeric_columns].rolling(window=5, center=True, min_periods=1).mean()
+    df[numeric_columns] = df[numeric_columns].rolling(window=5, center=True, min_periods=1).mean().astype(np.float32)
     
     return df
 
@@ -1,31 +1,41 @@
 import os
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # figures are only rendered into the PDF, also from the per-day worker processes
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
 from data_processing import load_data, preprocess_data, verify_file_format
 from statistical_analysis import generate_statistical_summary, calculate_correlations, calculate_daily_stats
 from visualization import plot_time_series, create_combined_pressure_plot, create_correlation_heatmap
-from outlier_detection import detect_outliers_isolation_forest, summarize_outliers
+from outlier_detection import detect_outliers_iqr, summarize_outliers
 from report_generation import generate_pdf_report
 
-def analyze_data(input_file, output_dir):
-    df = load_data(input_file)
+def analyze_data(data, output_dir, report_date=None):
+    # data is either the path of a CSV file or an already loaded slice of one
+    df = load_data(data) if isinstance(data, str) else data
     df = preprocess_data(df)
     
-    output_file = os.path.join(output_dir, f"analysis_report_{df.index[0].strftime('%Y-%m-%d')}.pdf")
+    if report_date is None:
+        report_date = df.index[0]
+    output_file = os.path.join(output_dir, f"analysis_report_{report_date.strftime('%Y-%m-%d')}.pdf")
     
-    stats = generate_statistical_summary(df)
-    correlations = calculate_correlations(df)
-    outliers = detect_outliers_isolation_forest(df)
+    # The numeric columns are found once and handed to every analysis step
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    stats = generate_statistical_summary(df, numeric_cols)
+    correlations = calculate_correlations(df, numeric_cols)
+    outliers = detect_outliers_iqr(df, numeric_cols=numeric_cols)
     
-    time_series_figures = plot_time_series(df, df.select_dtypes(include=[np.number]).columns)
+    time_series_figures = plot_time_series(df, numeric_cols)
     combined_pressure_fig = create_combined_pressure_plot(df)
-    correlation_heatmap_fig = create_correlation_heatmap(df)
+    correlation_heatmap_fig = create_correlation_heatmap(df, numeric_cols, correlations)
     
     all_figures = time_series_figures + [("Combined Pressure and Pump Values", combined_pressure_fig)]
     if correlation_heatmap_fig is not None:
         all_figures.append(("Correlation Heatmap", correlation_heatmap_fig))
     
     generate_pdf_report(output_file, df, stats, all_figures, outliers, correlations)
+    plt.close('all')  # worker processes analyze several days in turn
     print(f"Analysis complete. Report saved as: {output_file}")    
     
 def main():
@@ -58,21 +68,13 @@ def main():
         if choice == '1':
             analyze_data(input_file, output_dir)
         elif choice == '2':
-            # Split the dataframe into days and analyze each day
-            start_time = df.index[0].replace(hour=7, minute=0, second=0, microsecond=0)
-            end_time = df.index[-1]
-            current_day = start_time
-            
-            while current_day < end_time:
-                next_day = current_day + pd.Timedelta(days=1)
-                day_df = df[(df.index >= current_day) & (df.index < next_day)]
-                
-                if not day_df.empty:
-                    day_output_file = os.path.join(output_dir, f"analysis_report_{current_day.strftime('%Y-%m-%d')}.pdf")
-                    analyze_data(day_df, output_dir)
-                    print(f"Analysis complete for {current_day.strftime('%Y-%m-%d')}. Report saved in the output directory.")
-                
-                current_day = next_day
+            # Split the dataframe into 7AM-7AM days in one pass; each day is analyzed in its own process
+            days = [(day, day_df) for day, day_df in df.groupby(pd.Grouper(freq='24h', offset='7h')) if not day_df.empty]
+            with ProcessPoolExecutor() as executor:
+                futures = [executor.submit(analyze_data, day_df, output_dir, day) for day, day_df in days]
+                for (day, _), future in zip(days, futures):
+                    future.result()
+                    print(f"Analysis complete for {day.strftime('%Y-%m-%d')}. Report saved in the output directory.")
             
         elif choice == '3':
             start_date = input("Enter start date (YYYY-MM-DD): ").strip()
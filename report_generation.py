@@ -1,11 +1,33 @@
 from reportlab.lib.pagesizes import landscape, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, PageBreak, Image
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, PageBreak, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-import io
+from reportlab.lib.utils import ImageReader
+from PIL import Image as PILImage
+import numpy as np
 import matplotlib.pyplot as plt
 
+class FigureImage(Flowable):
+    """Draws an already rendered image at a fixed size; platypus.Image only accepts files."""
+
+    def __init__(self, image, width, height):
+        super().__init__()
+        self.image = image
+        self.width = width
+        self.height = height
+
+    def draw(self):
+        self.canv.drawImage(self.image, 0, 0, width=self.width, height=self.height)
+
+def figure_to_image(fig, width, height):
+    # Hand the rendered Agg pixels straight to ReportLab instead of encoding and re-decoding a PNG
+    fig.set_dpi(150)
+    fig.canvas.draw()
+    pixels = np.ascontiguousarray(np.asarray(fig.canvas.buffer_rgba())[..., :3])
+    plt.close(fig)  # the pixel copy holds everything the report needs
+    return FigureImage(ImageReader(PILImage.fromarray(pixels)), width=width, height=height)
+
 def generate_pdf_report(output_file, df, stats, figures, outliers, correlations):
     doc = SimpleDocTemplate(output_file, pagesize=landscape(A4))
     story = []
@@ -38,13 +60,7 @@ def generate_pdf_report(output_file, df, stats, figures, outliers, correlations)
     # Figures
     for title, fig in figures:
         story.append(Paragraph(title, styles['Heading2']))
-        img_data = io.BytesIO()
-        fig.savefig(img_data, format='png', dpi=300, bbox_inches='tight')
-        img_data.seek(0)
-        img = Image(img_data)
-        img.drawWidth = 7.5 * inch
-        img.drawHeight = 5 * inch
-        story.append(img)
+        story.append(figure_to_image(fig, 7.5 * inch, 5 * inch))
         story.append(PageBreak())
 
     # Outlier Analysis
@@ -1,16 +1,56 @@
 import pandas as pd
 import numpy as np
+import warnings
 
-def generate_statistical_summary(df):
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    summary = df[numeric_cols].describe()
-    summary.loc['range'] = summary.loc['max'] - summary.loc['min']
-    return summary
+# Columns converted to float64 at a time, so a spilled float32 block is never copied whole
+COLUMN_BLOCK = 8
 
-def calculate_correlations(df):
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    correlations = df[numeric_cols].corr()
-    return correlations
+# Rows read at a time when accumulating correlations
+ROW_BLOCK = 1 << 16
+
+def generate_statistical_summary(df, numeric_cols=None):
+    if numeric_cols is None:
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+    blocks = []
+    for start in range(0, len(numeric_cols), COLUMN_BLOCK):
+        X = df[numeric_cols[start:start + COLUMN_BLOCK]].to_numpy(dtype=float)
+        # One quantile call gives min, quartiles and max; describe() would make a pass per statistic
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns simply yield NaN
+            q = np.nanquantile(X, [0, 0.25, 0.5, 0.75, 1], axis=0)
+            blocks.append(np.vstack([np.count_nonzero(~np.isnan(X), axis=0), np.nanmean(X, axis=0),
+                                     np.nanstd(X, axis=0, ddof=1), q, q[-1] - q[0]]))
+    rows = np.hstack(blocks) if blocks else np.empty((9, 0))
+    return pd.DataFrame(rows, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max', 'range'], columns=numeric_cols)
+
+def calculate_correlations(df, numeric_cols=None):
+    # Pairwise-complete Pearson correlations, as df.corr() gives, accumulated over row blocks
+    # so a spilled numeric block is never copied into RAM whole
+    if numeric_cols is None:
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+    p = len(numeric_cols)
+    n, s, ss, sxy = (np.zeros((p, p)) for _ in range(4))
+    shift = None
+    for start in range(0, len(df), ROW_BLOCK):
+        X = df.iloc[start:start + ROW_BLOCK][numeric_cols].to_numpy(dtype=float, copy=True)
+        if shift is None:
+            # Centring on the first block's means keeps the sums of squares well conditioned
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                shift = np.nan_to_num(np.nanmean(X, axis=0))
+        X -= shift
+        present = ~np.isnan(X)
+        X[~present] = 0
+        M = present.astype(float)
+        # Entry [i, j] of each sum only counts rows where both columns i and j have a reading
+        n += M.T @ M
+        s += X.T @ M
+        ss += (X * X).T @ M
+        sxy += X.T @ X
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var = n * ss - s * s
+        correlations = (n * sxy - s * s.T) / np.sqrt(var * var.T)
+    return pd.DataFrame(correlations, index=numeric_cols, columns=numeric_cols)
 
 def calculate_daily_stats(df):
     daily_stats = df.resample('D').agg(['mean', 'min', 'max', 'std'])
@@ -1,5 +1,4 @@
 import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
 import numpy as np
 import matplotlib.dates as mdates
@@ -49,13 +48,15 @@ def create_combined_pressure_plot(df):
     
     return fig
 
-def create_correlation_heatmap(df):
-    numeric_df = df.select_dtypes(include=[np.number])
+def create_correlation_heatmap(df, numeric_cols=None, corr=None):
+    numeric_df = df.select_dtypes(include=[np.number]) if numeric_cols is None else df[numeric_cols]
     if numeric_df.empty:
         print("No numeric columns found for correlation heatmap.")
         return None
+    import seaborn as sns
     
-    corr = numeric_df.corr()
+    if corr is None:
+        corr = numeric_df.corr()
     fig, ax = plt.subplots(figsize=(11.69, 8.27))  # A4 landscape size in inches
     sns.heatmap(corr, annot=True, cmap='coolwarm', ax=ax, fmt='.2f')
     ax.set_title("Correlation Heatmap")